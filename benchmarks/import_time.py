@@ -0,0 +1,51 @@
+# Import necessary modules
+import argparse
+
+
+import subprocess
+
+
+import sys
+
+
+# Time the import of a module in a fresh interpreter, after its third-party dependencies are already loaded.
+TIMING_SCRIPT = '''
+import time
+import pandas
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+'''
+
+
+def time_import(module, repeats=5):
+    """
+    Measure the time taken to import a module of this project in a fresh interpreter.
+    Pandas is imported before the timer starts, so only the cost added by the module itself is measured.
+    Args:
+        module(str): the name of the module to be imported.
+        repeats(int): the number of fresh interpreters to time the import in.
+    Returns:
+        float: the fastest import time in seconds.
+    """
+    timings = []
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, '-c', TIMING_SCRIPT.format(module=module)], capture_output=True, text=True, check=True)
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check that the table loaders import without I/O or network access.')
+    parser.add_argument('modules', nargs='*', default=['table_loader'], help='the modules to be timed')
+    parser.add_argument('--limit', type=float, default=0.05, help='the maximum allowed import time in seconds')
+    parser.add_argument('--repeats', type=int, default=5, help='the number of fresh interpreters to time each import in')
+    arguments = parser.parse_args()
+
+    failed = False
+    for module in arguments.modules:
+        seconds = time_import(module, arguments.repeats)
+        status = 'ok' if seconds <= arguments.limit else 'too slow'
+        failed = failed or seconds > arguments.limit
+        print(f'{module}: {seconds * 1000:.1f} ms ({status}, limit {arguments.limit * 1000:.0f} ms)')
+    sys.exit(1 if failed else 0)
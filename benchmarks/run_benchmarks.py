@@ -0,0 +1,197 @@
+# Import necessary modules
+from benchmarks.synthetic_data import generate_loan_payments
+
+
+from data_frame_info import DataFrameInfo
+
+
+from data_frame_transform import DataFrameTransform
+
+
+from data_transform import DataTransform
+
+
+from table_loader import read_table, save_snapshot
+
+
+import argparse
+
+
+import data_transform
+
+
+import json
+
+
+import os
+
+
+import platform
+
+
+import sys
+
+
+import tempfile
+
+
+import time
+
+
+import tracemalloc
+
+
+import pandas as pd
+
+
+# The table sizes that can be benchmarked.
+SIZES = {'10k': 10000, '1m': 1000000, '10m': 10000000}
+
+# The sizes run when none are specified; 10m holds several copies of a 10 million row table in memory, so it is opt-in.
+DEFAULT_SIZES = ['10k', '1m']
+
+# Columns used by the benchmark cases, as in the loan_payments notebooks.
+RISK_FACTORS = ['grade', 'purpose', 'home_ownership']
+MEDIAN_COLUMNS = ['int_rate', 'funded_amount']
+
+
+def prepare(raw_table):
+    """
+    Convert a raw synthetic table as the transformation notebook does, for cases that need cleaned columns.
+    """
+    table = DataTransform(raw_table.copy()).iterate_through_columns()
+    return DataTransform(table).remove_term_column_strings()
+
+
+def uncached_date_transform(raw_table):
+    """
+    Provide a DataTransform of a copy of the raw table with the shared cache of parsed date strings cleared,
+    so the date conversion case times the parsing rather than cache lookups filled by prepare().
+    """
+    data_transform._parsed_dates = pd.Series(dtype='period[M]')
+    return DataTransform(raw_table.copy())
+
+
+def benchmark_cases(raw_table, prepared_table, directory):
+    """
+    Provide every benchmark case as a name mapped to a setup function and a function timed on its result.
+    Setup runs untimed, so each case only measures the method under test.
+    """
+    csv_file = os.path.join(directory, 'loan_payments.csv')
+    raw_table.to_csv(csv_file, index=False)
+    save_snapshot(prepared_table, csv_file)
+    csv_only_file = os.path.join(directory, 'csv_only.csv')
+    raw_table.to_csv(csv_only_file, index=False)
+
+    return {
+        'DataTransform.iterate_through_columns': (lambda: uncached_date_transform(raw_table), lambda transform: transform.iterate_through_columns()),
+        'DataTransform.remove_term_column_strings': (lambda: DataTransform(raw_table.copy()), lambda transform: transform.remove_term_column_strings()),
+        'DataTransform.compact_dtypes': (lambda: DataTransform(prepared_table.copy()), lambda transform: transform.compact_dtypes()),
+        'DataFrameInfo.percentage_null_values': (lambda: DataFrameInfo(raw_table), lambda info: info.percentage_null_values()),
+        'DataFrameInfo.profile': (lambda: DataFrameInfo(prepared_table), lambda info: info.profile()),
+        'DataFrameInfo.column_skew': (lambda: DataFrameInfo(prepared_table), lambda info: info.column_skew()),
+        'DataFrameInfo.chi_square_scan': (lambda: DataFrameInfo(raw_table), lambda info: info.chi_square_scan(RISK_FACTORS)),
+        'DataFrameTransform.impute_with_median': (lambda: DataFrameTransform(prepared_table.copy()), lambda transform: transform.impute_with_median(MEDIAN_COLUMNS)),
+        'DataFrameTransform.yeojohnson_transform': (lambda: DataFrameTransform(prepared_table.copy().fillna(prepared_table.median(numeric_only=True))),
+                                                    lambda transform: transform.yeojohnson_transform(transform.find_info.column_skew(), plot=False)),
+        'DataFrameTransform.impute_outliers': (lambda: DataFrameTransform(prepared_table.copy()), lambda transform: transform.impute_outliers()),
+        'open_table (CSV)': (lambda: csv_only_file, lambda file_name: read_table(file_name)),
+        'open_table (Parquet)': (lambda: csv_file, lambda file_name: read_table(file_name)),
+        'open_table (Parquet, 3 columns)': (lambda: csv_file, lambda file_name: read_table(file_name, columns=['loan_status', 'term', 'instalment'])),
+    }
+
+
+def measure(setup, function, repeats):
+    """
+    Time a function and trace its peak memory allocation.
+    Returns:
+        dict: the fastest wall time in seconds over the repeats and the peak memory allocated during one run in MB.
+    """
+    timings = []
+    for _ in range(repeats):
+        argument = setup()
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+
+    argument = setup()
+    tracemalloc.start()
+    function(argument)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': min(timings), 'peak_mb': peak / 1e6}
+
+
+def run(sizes, repeats, cases=None):
+    """
+    Run the benchmark cases on synthetic tables of each size.
+    Args:
+        sizes(list): the keys of SIZES to be run.
+        repeats(int): the number of timed runs of each case; the fastest is kept.
+        cases(list): the names of the cases to be run, or every case if not specified (optional).
+    Returns:
+        list: a result dictionary for each case and size.
+    """
+    results = []
+    for size in sizes:
+        raw_table = generate_loan_payments(SIZES[size])
+        prepared_table = prepare(raw_table)
+        with tempfile.TemporaryDirectory() as directory:
+            for name, (setup, function) in benchmark_cases(raw_table, prepared_table, directory).items():
+                if cases and name not in cases:
+                    continue
+                result = {'case': name, 'size': size, 'rows': SIZES[size], **measure(setup, function, repeats)}
+                print(f"{name:<45} {size:>4} {result['seconds']:>10.4f} s {result['peak_mb']:>10.1f} MB")
+                results.append(result)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with a saved baseline run.
+    Args:
+        results(list): the results of the current run.
+        baseline(dict): a saved benchmark report.
+        tolerance(float): the fractional slow-down or memory growth allowed before a case counts as a regression.
+    Returns:
+        list: a description of every regression.
+    """
+    baseline_results = {(result['case'], result['size']): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        previous = baseline_results.get((result['case'], result['size']))
+        if previous is None:
+            continue
+        for metric in ('seconds', 'peak_mb'):
+            if result[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{result['case']} ({result['size']}): {metric} {previous[metric]:.4f} -> {result[metric]:.4f}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the loan_payments transformation, analysis and loading hot paths on synthetic data.')
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=DEFAULT_SIZES, help='the table sizes to be benchmarked; 10m needs tens of GB of memory')
+    parser.add_argument('--cases', nargs='+', help='the names of the cases to be run (default: every case)')
+    parser.add_argument('--repeats', type=int, default=3, help='the number of timed runs of each case')
+    parser.add_argument('--output', default=os.path.join('benchmarks', 'results', 'latest.json'), help='the JSON file the results are saved to')
+    parser.add_argument('--compare', help='a previously saved JSON report to check for regressions against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='the fractional slow-down allowed before a case counts as a regression')
+    arguments = parser.parse_args()
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'results': run(arguments.sizes, arguments.repeats, arguments.cases),
+    }
+    os.makedirs(os.path.dirname(arguments.output) or '.', exist_ok=True)
+    with open(arguments.output, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    if arguments.compare:
+        with open(arguments.compare, 'r') as file:
+            regressions = compare(report['results'], json.load(file), arguments.tolerance)
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        sys.exit(1 if regressions else 0)
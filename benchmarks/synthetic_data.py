@@ -0,0 +1,159 @@
+# Import necessary modules
+import argparse
+
+
+import numpy as np
+
+
+import pandas as pd
+
+
+# Every MMM-YYYY string from January 1970, indexed by the number of months since then.
+MONTH_STRINGS = np.asarray(pd.period_range('1970-01', '2030-12', freq='M').strftime('%b-%Y'), dtype=object)
+
+# Months since January 1970 of the first and last issue dates generated.
+FIRST_ISSUE_MONTH = (2013 - 1970) * 12
+LAST_ISSUE_MONTH = (2021 - 1970) * 12
+
+LOAN_STATUSES = {
+    'Current': 0.36, 'Fully Paid': 0.51, 'Charged Off': 0.09, 'Late (31-120 days)': 0.012, 'In Grace Period': 0.006,
+    'Late (16-30 days)': 0.002, 'Default': 0.001, 'Does not meet the credit policy. Status:Fully Paid': 0.012,
+    'Does not meet the credit policy. Status:Charged Off': 0.007,
+}
+GRADES = {'A': 0.17, 'B': 0.30, 'C': 0.26, 'D': 0.15, 'E': 0.08, 'F': 0.03, 'G': 0.01}
+PURPOSES = {
+    'debt_consolidation': 0.58, 'credit_card': 0.21, 'home_improvement': 0.06, 'other': 0.05, 'major_purchase': 0.025,
+    'small_business': 0.015, 'car': 0.012, 'medical': 0.01, 'moving': 0.007, 'vacation': 0.006, 'wedding': 0.004,
+    'house': 0.004, 'renewable_energy': 0.001, 'educational': 0.006,
+}
+HOME_OWNERSHIP = {'MORTGAGE': 0.49, 'RENT': 0.41, 'OWN': 0.095, 'OTHER': 0.004, 'NONE': 0.001}
+EMPLOYMENT_LENGTHS = ['< 1 year', '1 year', '2 years', '3 years', '4 years', '5 years', '6 years', '7 years', '8 years', '9 years', '10+ years']
+VERIFICATION_STATUSES = ['Not Verified', 'Source Verified', 'Verified']
+OUTSTANDING_STATUSES = ['Current', 'Late (31-120 days)', 'In Grace Period', 'Late (16-30 days)', 'Default']
+CHARGED_OFF_STATUSES = ['Charged Off', 'Does not meet the credit policy. Status:Charged Off']
+
+
+def _choice(generator, options, n_rows):
+    """
+    Draw n_rows values from a dictionary of options and their probabilities.
+    """
+    probabilities = np.asarray(list(options.values()))
+    return np.asarray(list(options), dtype=object)[generator.choice(len(options), size=n_rows, p=probabilities / probabilities.sum())]
+
+
+def _with_nulls(generator, values, fraction):
+    """
+    Replace a random fraction of the values with nulls, as in the loan_payments table.
+    """
+    values = pd.Series(values)
+    return values.mask(generator.random(len(values)) < fraction)
+
+
+def generate_loan_payments(n_rows, seed=0, first_id=1):
+    """
+    Generate a synthetic table with the schema and approximate distributions of the raw loan_payments table.
+    Dates are MMM-YYYY strings, 'term' holds strings such as '36 months', money columns are right-skewed
+    and the columns imputed or dropped in this project contain nulls in similar proportions.
+    Args:
+        n_rows(int): the number of loans to generate.
+        seed(int): the seed of the random number generator, so repeated runs produce the same table.
+        first_id(int): the id of the first loan, so separately generated chunks do not share ids.
+    Returns:
+        pandas.DataFrame: the synthetic loan_payments table.
+    """
+    generator = np.random.default_rng(seed)
+    ids = np.arange(first_id, first_id + n_rows)
+
+    loan_amount = np.clip(np.round(generator.lognormal(9.3, 0.6, n_rows) / 25) * 25, 500, 35000)
+    funded_amount = np.minimum(loan_amount, np.round(loan_amount * generator.uniform(0.95, 1.0, n_rows), -1))
+    funded_amount_inv = np.round(funded_amount * generator.uniform(0.9, 1.0, n_rows), 2)
+    term_months = np.where(generator.random(n_rows) < 0.7, 36, 60)
+    int_rate = np.round(np.clip(generator.normal(13.5, 4.4, n_rows), 5.4, 26.1), 2)
+    monthly_rate = int_rate / 1200
+    instalment = np.round(funded_amount * monthly_rate / (1 - (1 + monthly_rate) ** -term_months), 2)
+    grade = _choice(generator, GRADES, n_rows)
+    loan_status = _choice(generator, LOAN_STATUSES, n_rows)
+
+    issue_month = generator.integers(FIRST_ISSUE_MONTH, LAST_ISSUE_MONTH + 1, n_rows)
+    settled = np.isin(loan_status, ['Fully Paid', 'Does not meet the credit policy. Status:Fully Paid'])
+    outstanding = np.isin(loan_status, OUTSTANDING_STATUSES)
+    charged_off = np.isin(loan_status, CHARGED_OFF_STATUSES)
+    payments_made = np.where(settled, generator.integers(12, term_months + 1), generator.integers(1, term_months + 1))
+    payments_made = np.where(charged_off, generator.integers(1, np.maximum(term_months // 2, 2)), payments_made)
+    last_payment_month = issue_month + payments_made - 1
+
+    total_payment = np.round(np.where(settled, instalment * payments_made * generator.uniform(0.7, 1.0, n_rows), instalment * payments_made), 2)
+    out_prncp = np.round(np.where(outstanding, funded_amount * (1 - payments_made / term_months), 0.0), 2)
+    total_rec_int = np.round(total_payment * monthly_rate * term_months / 2 / (1 + monthly_rate * term_months / 2), 2)
+    recoveries = np.round(np.where(charged_off, generator.exponential(400, n_rows) * (generator.random(n_rows) < 0.6), 0.0), 2)
+
+    table = pd.DataFrame({
+        'id': ids,
+        'member_id': ids + generator.integers(1, 1000, n_rows),
+        'loan_amount': loan_amount.astype('int64'),
+        'funded_amount': _with_nulls(generator, funded_amount, 0.055),
+        'funded_amount_inv': funded_amount_inv,
+        'term': _with_nulls(generator, np.char.add(term_months.astype(str), ' months'), 0.088),
+        'int_rate': _with_nulls(generator, int_rate, 0.095),
+        'instalment': instalment,
+        'grade': grade,
+        'sub_grade': np.char.add(grade.astype(str), generator.integers(1, 6, n_rows).astype(str)),
+        'employment_length': _with_nulls(generator, np.asarray(EMPLOYMENT_LENGTHS, dtype=object)[generator.integers(0, len(EMPLOYMENT_LENGTHS), n_rows)], 0.039),
+        'home_ownership': _choice(generator, HOME_OWNERSHIP, n_rows),
+        'annual_inc': np.round(generator.lognormal(11.0, 0.5, n_rows), -2),
+        'verification_status': np.asarray(VERIFICATION_STATUSES, dtype=object)[generator.integers(0, 3, n_rows)],
+        'issue_date': MONTH_STRINGS[issue_month],
+        'loan_status': loan_status,
+        'payment_plan': np.where(generator.random(n_rows) < 0.0001, 'y', 'n'),
+        'purpose': _choice(generator, PURPOSES, n_rows),
+        'dti': np.round(generator.uniform(0, 35, n_rows), 2),
+        'delinq_2yrs': generator.poisson(0.25, n_rows),
+        'earliest_credit_line': MONTH_STRINGS[issue_month - generator.integers(36, 480, n_rows).clip(max=issue_month)],
+        'inq_last_6mths': generator.poisson(0.8, n_rows),
+        'mths_since_last_delinq': _with_nulls(generator, generator.integers(0, 150, n_rows).astype('float64'), 0.57),
+        'mths_since_last_record': _with_nulls(generator, generator.integers(0, 130, n_rows).astype('float64'), 0.886),
+        'open_accounts': generator.poisson(10, n_rows) + 1,
+        'total_accounts': generator.poisson(22, n_rows) + 2,
+        'out_prncp': out_prncp,
+        'out_prncp_inv': np.round(out_prncp * funded_amount_inv / funded_amount, 2),
+        'total_payment': total_payment,
+        'total_payment_inv': np.round(total_payment * funded_amount_inv / funded_amount, 2),
+        'total_rec_prncp': np.round(total_payment - total_rec_int, 2),
+        'total_rec_int': total_rec_int,
+        'total_rec_late_fee': np.round(generator.exponential(15, n_rows) * (generator.random(n_rows) < 0.03), 2),
+        'recoveries': recoveries,
+        'collection_recovery_fee': np.round(recoveries * generator.uniform(0, 0.2, n_rows), 2),
+        'last_payment_date': _with_nulls(generator, MONTH_STRINGS[last_payment_month], 0.0013),
+        'last_payment_amount': np.round(np.where(settled, instalment * generator.uniform(1, 20, n_rows), instalment), 2),
+        'next_payment_date': pd.Series(MONTH_STRINGS[last_payment_month + 1]).where(outstanding),
+        'last_credit_pull_date': _with_nulls(generator, MONTH_STRINGS[last_payment_month + generator.integers(0, 6, n_rows)], 0.0001),
+        'collections_12_mths_ex_med': _with_nulls(generator, (generator.random(n_rows) < 0.004).astype('float64'), 0.0009),
+        'mths_since_last_major_derog': _with_nulls(generator, generator.integers(0, 150, n_rows).astype('float64'), 0.862),
+        'policy_code': 1,
+        'application_type': 'INDIVIDUAL',
+    })
+    return table
+
+
+def write_loan_payments(file_name, n_rows, seed=0, chunksize=1000000):
+    """
+    Write a synthetic loan_payments CSV file in chunks, so tables larger than memory can be generated.
+    Args:
+        file_name(str): the name of the CSV file to be written.
+        n_rows(int): the number of loans to generate.
+        seed(int): the seed of the first chunk; each later chunk uses the next seed.
+        chunksize(int): the maximum number of rows generated at once.
+    """
+    with open(file_name, 'w', newline='') as file:
+        for index, start in enumerate(range(0, n_rows, chunksize)):
+            chunk = generate_loan_payments(min(chunksize, n_rows - start), seed=seed + index, first_id=start + 1)
+            chunk.to_csv(file, header=(index == 0), index=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic loan_payments CSV file for offline use.')
+    parser.add_argument('rows', type=int, help='the number of loans to generate')
+    parser.add_argument('--output', default='loan_payments.csv', help='the name of the CSV file to be written')
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the random number generator')
+    arguments = parser.parse_args()
+    write_loan_payments(arguments.output, arguments.rows, arguments.seed)
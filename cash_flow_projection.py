@@ -0,0 +1,109 @@
+# Import necessary modules
+from data_transform import convert_date_columns
+
+
+from portfolio_metrics import CHARGED_OFF_STATUSES
+
+
+import numpy as np
+
+
+import pandas as pd
+
+
+# The loan_status values of loans with no instalments left to pay.
+SETTLED_STATUSES = ['Fully Paid', 'Does not meet the credit policy. Status:Fully Paid']
+
+
+def month_numbers(column):
+    """
+    Convert a date column to a count of months, so differences between dates are numbers of months.
+    Args:
+        column(pandas.Series): a column of monthly periods or MMM-YYYY strings.
+    Returns:
+        pandas.Series: the number of months since January of year 0, with NaN for missing dates.
+    """
+    if not isinstance(column.dtype, pd.PeriodDtype):
+        column = convert_date_columns(column.to_frame(), [column.name])[column.name]
+    return column.dt.year * 12 + column.dt.month - 1
+
+
+def remaining_instalments(loan_payments, settled_statuses=SETTLED_STATUSES):
+    """
+    Calculate the number of scheduled instalments each loan has left after its last payment.
+    Args:
+        loan_payments(pandas.DataFrame): a table of loans with 'term', 'issue_date', 'last_payment_date' and 'loan_status' columns.
+        settled_statuses(list): the loan_status values of loans with nothing left to pay.
+    Returns:
+        NumPy array: the number of remaining instalments of each loan, between 0 and its term.
+    """
+    term = loan_payments['term'].to_numpy(dtype='float64', na_value=np.nan)
+    # A loan without a recorded payment has paid nothing; otherwise one instalment is due per month from the issue month.
+    payments_made = (month_numbers(loan_payments['last_payment_date']) - month_numbers(loan_payments['issue_date']) + 1).fillna(0).to_numpy(dtype='float64')
+    remaining = np.clip(np.nan_to_num(term - payments_made, nan=0.0), 0, np.nan_to_num(term, nan=0.0))
+    remaining[loan_payments['loan_status'].isin(settled_statuses).to_numpy()] = 0
+    return remaining.astype('int64')
+
+
+def schedule_matrix(loan_payments, horizon=None, settled_statuses=SETTLED_STATUSES):
+    """
+    Build the loans by months matrix of scheduled instalments after each loan's last payment.
+    Holds one value per loan and month, so is intended for subsets of the book; project_cash_flows does not build it.
+    Args:
+        loan_payments(pandas.DataFrame): a table of loans with 'instalment', 'term', 'issue_date', 'last_payment_date' and 'loan_status' columns.
+        horizon(int): the number of months to project, defaulting to the longest term (optional).
+        settled_statuses(list): the loan_status values of loans with nothing left to pay.
+    Returns:
+        NumPy array: the instalment due from each loan (rows) in each month after its last payment (columns).
+    """
+    remaining = remaining_instalments(loan_payments, settled_statuses)
+    horizon = horizon or int(np.nanmax(loan_payments['term'].to_numpy(dtype='float64', na_value=np.nan), initial=0))
+    instalments = np.nan_to_num(loan_payments['instalment'].to_numpy(dtype='float64', na_value=np.nan))
+    months = np.arange(1, horizon + 1)
+    return np.where(months[np.newaxis, :] <= remaining[:, np.newaxis], instalments[:, np.newaxis], 0.0)
+
+
+def project_cash_flows(loan_payments, segment_column=None, horizon=None, loss_statuses=CHARGED_OFF_STATUSES, settled_statuses=SETTLED_STATUSES):
+    """
+    Project the expected and lost instalment cash flows for each month after the last payment, per segment.
+
+    Instalments of loans in loss_statuses are counted as lost and all other outstanding instalments as expected.
+    Loans are summed by their number of remaining instalments with np.bincount, and a reversed cumulative sum gives
+    the amount due in each month, so the cost grows with the number of loans plus months rather than their product.
+
+    Args:
+        loan_payments(pandas.DataFrame): a table of loans with 'instalment', 'term', 'issue_date', 'last_payment_date' and 'loan_status' columns.
+        segment_column(str): a column to project each segment separately, e.g. 'grade' or 'loan_status' (optional).
+        horizon(int): the number of months to project, defaulting to the longest term (optional).
+        loss_statuses(list): the loan_status values of loans whose remaining instalments are lost.
+        settled_statuses(list): the loan_status values of loans with nothing left to pay.
+
+    Returns:
+        pandas.DataFrame: the expected and lost cash flow of each segment and month, with their cumulative totals.
+    """
+    remaining = remaining_instalments(loan_payments, settled_statuses)
+    horizon = horizon or int(np.nanmax(loan_payments['term'].to_numpy(dtype='float64', na_value=np.nan), initial=0))
+    remaining = np.minimum(remaining, horizon)
+    instalments = np.nan_to_num(loan_payments['instalment'].to_numpy(dtype='float64', na_value=np.nan))
+    lost = loan_payments['loan_status'].isin(loss_statuses).to_numpy()
+
+    if segment_column is None:
+        segment_codes, segments = np.zeros(len(loan_payments), dtype='int64'), pd.Index(['All'])
+    else:
+        segment_codes, segments = pd.factorize(loan_payments[segment_column].astype(object).fillna('Unknown'))
+
+    cash_flows = {}
+    for kind, rows in (('expected', ~lost), ('lost', lost)):
+        # Column r of the totals holds the instalments of loans with r instalments remaining; each pays in months 1 to r.
+        totals = np.bincount(segment_codes[rows] * (horizon + 1) + remaining[rows], weights=instalments[rows],
+                             minlength=len(segments) * (horizon + 1)).reshape(len(segments), horizon + 1)
+        cash_flows[kind] = totals[:, ::-1].cumsum(axis=1)[:, ::-1][:, 1:]
+
+    return pd.DataFrame({
+        'segment': np.repeat(np.asarray(segments, dtype=object), horizon),
+        'month': np.tile(np.arange(1, horizon + 1), len(segments)),
+        'expected': cash_flows['expected'].ravel(),
+        'lost': cash_flows['lost'].ravel(),
+        'cumulative_expected': cash_flows['expected'].cumsum(axis=1).ravel(),
+        'cumulative_lost': cash_flows['lost'].cumsum(axis=1).ravel(),
+    })
@@ -0,0 +1,323 @@
+# Import necessary modules
+import numpy as np
+
+
+import pandas as pd
+
+
+def csv_chunks(file_name, chunksize=100000, **read_options):
+    """
+    Provide a reusable source of DataFrame chunks read from a CSV file.
+    Args:
+        file_name(str): the name of the CSV file.
+        chunksize(int): the maximum number of rows in each chunk.
+        read_options: further keyword arguments for pandas.read_csv (optional).
+    Returns:
+        function: returns a new iterator over the chunks of the file each time it is called.
+    """
+    return lambda: pd.read_csv(file_name, chunksize=chunksize, **read_options)
+
+
+def map_chunks(chunks, function):
+    """
+    Provide a reusable source of chunks with a function applied to each chunk, e.g. DataTransform conversions.
+    Args:
+        chunks(function): returns a new iterator of DataFrame chunks each time it is called.
+        function(function): takes a DataFrame chunk and returns the converted chunk.
+    Returns:
+        function: returns a new iterator over the converted chunks each time it is called.
+    """
+    return lambda: (function(chunk) for chunk in chunks())
+
+
+class QuantileSketch:
+    """
+    Initialise a mergeable, bounded-size summary of a column's distribution for approximate quantiles.
+
+    Values are kept as weighted centroids. When more than size centroids are held, neighbouring centroids are
+    merged into size groups of equal weight, so quantile estimates are within roughly 1/size of the true rank.
+
+    Attributes:
+        size (int): the maximum number of centroids kept after compression.
+    """
+    def __init__(self, size=2000):
+        """
+        See help(QuantileSketch) for accurate signature.
+        """
+        self.size = size
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+
+    def update(self, values):
+        """
+        Add an array of values to the sketch; missing values are ignored.
+        """
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        self.values = np.concatenate([self.values, values])
+        self.weights = np.concatenate([self.weights, np.ones(len(values))])
+        self._compress()
+
+    def merge(self, other):
+        """
+        Add the centroids of another sketch to this sketch.
+        """
+        self.values = np.concatenate([self.values, other.values])
+        self.weights = np.concatenate([self.weights, other.weights])
+        self._compress()
+
+    def _compress(self):
+        """
+        Sort the centroids and merge them into at most size groups of equal weight.
+        """
+        order = np.argsort(self.values, kind='stable')
+        self.values, self.weights = self.values[order], self.weights[order]
+        if len(self.values) <= self.size:
+            return
+        cumulative_weights = np.cumsum(self.weights)
+        groups = np.minimum(((cumulative_weights - self.weights / 2) / cumulative_weights[-1] * self.size).astype(int), self.size - 1)
+        weights = np.bincount(groups, weights=self.weights, minlength=self.size)
+        values = np.bincount(groups, weights=self.weights * self.values, minlength=self.size)
+        kept = weights > 0
+        self.values, self.weights = values[kept] / weights[kept], weights[kept]
+
+    def quantile(self, q):
+        """
+        Estimate a quantile of the values added to the sketch.
+        Args:
+            q(float): the quantile to be estimated, between 0 and 1.
+        Returns:
+            float: the estimated quantile, or NaN when the sketch is empty.
+        """
+        if not len(self.values):
+            return np.nan
+        # Each centroid sits at the middle of its share of the cumulative weight, matching linear interpolation for unit weights.
+        positions = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.weights.sum(), positions, self.values))
+
+
+class ChunkedDataFrameInfo:
+    """
+    Initialise class for deriving information about a table too large to hold in memory, read as a sequence of chunks.
+
+    All statistics are gathered in a single pass over the chunks, on first use, with mergeable accumulators:
+    counts, means and central moments for the mean and skew, quantile sketches for the median and value counts for the mode.
+
+    Attributes:
+        chunks (function): returns a new iterator of DataFrame chunks each time it is called, e.g. csv_chunks('loan_payments.csv').
+        mode_columns (list): the columns whose modes are tracked, defaulting to every non-numeric column, as value counts grow with the number of distinct values.
+        sketch_size (int): the number of centroids kept by each quantile sketch.
+    """
+    def __init__(self, chunks, mode_columns=None, sketch_size=2000):
+        """
+        See help(ChunkedDataFrameInfo) for accurate signature.
+        """
+        self.chunks = chunks
+        self.mode_columns = mode_columns
+        self.sketch_size = sketch_size
+        self._accumulated = False
+
+    def _accumulate(self):
+        """
+        Read every chunk once and merge its statistics into the running accumulators.
+        """
+        if self._accumulated:
+            return
+        self.row_count = 0
+        self.columns = None
+        self.null_counts = None
+        self.counts = self.means = self.second_moments = self.third_moments = None
+        self.sketches = {}
+        self.value_counts = {}
+
+        for chunk in self.chunks():
+            if self.columns is None:
+                self.columns = list(chunk.columns)
+                self.null_counts = pd.Series(0, index=self.columns, dtype='int64')
+                if self.mode_columns is None:
+                    self.mode_columns = list(chunk.select_dtypes(exclude='number').columns)
+            self.row_count += len(chunk)
+            self.null_counts = self.null_counts.add(chunk.isnull().sum(), fill_value=0)
+            self._merge_moments(chunk.select_dtypes(include='number'))
+            for column, values in chunk.select_dtypes(include='number').items():
+                self.sketches.setdefault(column, QuantileSketch(self.sketch_size)).update(values.to_numpy(dtype='float64', na_value=np.nan))
+            for column in self.mode_columns:
+                counts = chunk[column].value_counts()
+                self.value_counts[column] = self.value_counts[column].add(counts, fill_value=0) if column in self.value_counts else counts
+        self._accumulated = True
+
+    def _merge_moments(self, numeric_chunk):
+        """
+        Merge the count, mean and second and third central moments of a chunk into the running totals.
+        Uses the pairwise update formulas, which stay accurate for large money values where raw power sums would not.
+        """
+        counts = numeric_chunk.count().astype('float64')
+        means = numeric_chunk.mean()
+        deviations = numeric_chunk - means
+        second_moments = (deviations ** 2).sum()
+        third_moments = (deviations ** 3).sum()
+        if self.counts is None:
+            self.counts, self.means, self.second_moments, self.third_moments = counts, means.fillna(0), second_moments, third_moments
+            return
+
+        counts_a, means_a, second_a, third_a = (series.reindex(counts.index.union(self.counts.index), fill_value=0) for series in (self.counts, self.means, self.second_moments, self.third_moments))
+        counts_b, means_b, second_b, third_b = (series.reindex(counts_a.index, fill_value=0) for series in (counts, means.fillna(0), second_moments, third_moments))
+        total = counts_a + counts_b
+        safe_total = total.where(total > 0, 1)
+        delta = means_b - means_a
+        self.means = means_a + delta * counts_b / safe_total
+        self.second_moments = second_a + second_b + delta ** 2 * counts_a * counts_b / safe_total
+        self.third_moments = (third_a + third_b + delta ** 3 * counts_a * counts_b * (counts_a - counts_b) / safe_total ** 2
+                              + 3 * delta * (counts_a * second_b - counts_b * second_a) / safe_total)
+        self.counts = total
+
+    def get_dataframe_shape(self):
+        """
+        Provide the shape of the whole table.
+
+        Returns:
+            tuple: the number of rows and columns.
+        """
+        self._accumulate()
+        return self.row_count, len(self.columns)
+
+    def percentage_null_values(self):
+        """
+        Provide the percentage of null values in each column of the whole table.
+
+        Return:
+            pandas.DataFrame: the percentage of null values against each column of the table.
+        """
+        self._accumulate()
+        null_percentages_table = (self.null_counts * 100 / self.row_count).to_frame('percentage_null_values')
+        return null_percentages_table.sort_values(by='percentage_null_values', ascending=False).round(2)
+
+    def get_column_mean(self, column_name):
+        """
+        Calculate the mean of a column over the whole table.
+
+        Args:
+            column_name(str): the name of a numeric column.
+
+        Provides:
+            float: the mean rounded to 0 decimal places, as in DataFrameInfo.get_column_mean.
+        """
+        self._accumulate()
+        return np.round(self.means[column_name] if self.counts[column_name] else np.nan, 0)
+
+    def get_median(self, column_name):
+        """
+        Estimate the median of a column over the whole table from its quantile sketch.
+
+        Args:
+            column_name(str): the name of a numeric column.
+
+        Returns:
+            float: the estimated median.
+        """
+        self._accumulate()
+        return self.sketches[column_name].quantile(0.5)
+
+    def get_mode(self, column_name):
+        """
+        Provide the most frequent value of a column over the whole table.
+
+        Args:
+            column_name(str): the name of a column in mode_columns.
+
+        Returns:
+            the value of the mode, or NaN when the column has no values.
+        """
+        self._accumulate()
+        counts = self.value_counts[column_name]
+        return counts.idxmax() if len(counts) else np.nan
+
+    def column_skew(self, *column_names):
+        """
+        Calculate skew scores over the whole table with the same bias adjustment as pandas.
+
+        Args:
+            column_names(list): the list of column names for assessing skew (optional).
+
+        Returns:
+            pandas.Series: the skew scores against each numeric column, or a float for a single specified column.
+        """
+        self._accumulate()
+        counts = self.counts
+        skew = counts * (counts - 1) ** 0.5 / (counts - 2) * self.third_moments / self.second_moments ** 1.5
+        skew = skew.where(counts > 2).mask((counts > 2) & (self.second_moments == 0), 0.0)
+        if column_names:
+            return skew[column_names[-1]]
+        return skew
+
+
+class ChunkedDataFrameTransform:
+    """
+    Initialise the class for applying row removal and imputations to a chunked table, writing the result to a new file.
+
+    Operations are queued and applied to each chunk in order when save is called. Fill values are statistics of the whole
+    source table from find_info, so unlike DataFrameTransform they are not affected by rows dropped earlier in the queue.
+
+    Attributes:
+        chunks (function): returns a new iterator of DataFrame chunks each time it is called.
+        find_info (ChunkedDataFrameInfo): the statistics of the whole source table, defaulting to a new instance over the same chunks.
+    """
+    def __init__(self, chunks, find_info=None):
+        """
+        See help(ChunkedDataFrameTransform) for accurate signature.
+        """
+        self.chunks = chunks
+        self.find_info = find_info if find_info is not None else ChunkedDataFrameInfo(chunks)
+        self.operations = []
+
+    def drop_columns(self, columns):
+        """
+        Queue removal of the specified columns.
+        """
+        self.operations.append(lambda chunk: chunk.drop(columns, axis=1, errors='ignore'))
+        return self
+
+    def drop_rows(self, columns):
+        """
+        Queue removal of rows containing null values in the specified columns.
+        """
+        self.operations.append(lambda chunk: chunk.dropna(subset=columns))
+        return self
+
+    def impute_with_mean(self, columns):
+        """
+        Queue imputation of null values with the mean of each column over the whole table.
+        """
+        self.operations.append(lambda chunk: chunk.fillna({column: self.find_info.get_column_mean(column) for column in columns}))
+        return self
+
+    def impute_with_median(self, columns):
+        """
+        Queue imputation of null values with the estimated median of each column over the whole table.
+        """
+        self.operations.append(lambda chunk: chunk.fillna({column: self.find_info.get_median(column) for column in columns}))
+        return self
+
+    def impute_with_mode(self, columns):
+        """
+        Queue imputation of null values with the mode of each column over the whole table.
+        """
+        self.operations.append(lambda chunk: chunk.fillna({column: self.find_info.get_mode(column) for column in columns}))
+        return self
+
+    def save(self, file_name):
+        """
+        Apply the queued operations chunk by chunk and write the result to a CSV file.
+        Args:
+            file_name(str): the name of the CSV file to be written.
+        Returns:
+            int: the number of rows written.
+        """
+        rows_written = 0
+        with open(file_name, 'w', newline='') as file:
+            for index, chunk in enumerate(self.chunks()):
+                for operation in self.operations:
+                    chunk = operation(chunk)
+                chunk.to_csv(file, header=(index == 0), index=False)
+                rows_written += len(chunk)
+        return rows_written
@@ -0,0 +1,196 @@
+# Import necessary modules
+from concurrent.futures import ProcessPoolExecutor
+
+
+from data_frame_info import DataFrameInfo
+
+
+from multiprocessing import shared_memory
+
+
+import numpy as np
+
+
+import pandas as pd
+
+
+# The analyses run on each cohort, keyed by name. Each takes the DataFrameInfo of a cohort and returns a dict or Series of results.
+ANALYSES = {}
+
+
+def register_analysis(name):
+    """
+    Register a function as a cohort analysis, so CohortRunner.run includes it by default.
+    Args:
+        name(str): the name of the analysis, used as the first level of the result columns.
+    Returns:
+        function: a decorator that registers the function and returns it unchanged.
+    """
+    def register(function):
+        ANALYSES[name] = function
+        return function
+    return register
+
+
+@register_analysis('rows')
+def row_count(info):
+    """
+    Count the loans in the cohort.
+    """
+    return {'count': len(info.dataframe)}
+
+
+@register_analysis('percentage_null')
+def percentage_null(info):
+    """
+    Provide the percentage of null values in each column of the cohort.
+    """
+    return info.percentage_null_values()['percentage_null_values']
+
+
+@register_analysis('mean')
+def mean(info):
+    """
+    Provide the mean of each numeric column of the cohort.
+    """
+    return info.profile(list(info.dataframe.select_dtypes(include='number').columns))['mean']
+
+
+@register_analysis('median')
+def median(info):
+    """
+    Provide the median of each numeric column of the cohort.
+    """
+    return info.profile(list(info.dataframe.select_dtypes(include='number').columns))['median']
+
+
+@register_analysis('skew')
+def skew(info):
+    """
+    Provide the skew of each numeric column of the cohort.
+    """
+    return info.column_skew()
+
+
+def _attach(name, shape, dtype):
+    """
+    Attach to a shared memory block and view it as an array.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _run_cohort(layout, start, stop, analyses):
+    """
+    Run the analyses on one cohort, held in rows start to stop of the shared memory blocks described by layout.
+    Defined at module level so it can be sent to worker processes.
+    """
+    numeric_memory, numeric_values = _attach(layout['numeric_name'], layout['numeric_shape'], 'float64')
+    code_memory, code_values = _attach(layout['code_name'], layout['code_shape'], 'int32')
+    try:
+        # The numeric columns are a view of the shared block, so the cohort is never copied into the worker.
+        cohort = pd.DataFrame(numeric_values[:, start:stop].T, columns=layout['numeric_columns'], copy=False)
+        for index, column in enumerate(layout['code_columns']):
+            cohort[column] = pd.Categorical.from_codes(code_values[index, start:stop], layout['categories'][index])
+        info = DataFrameInfo(cohort)
+        results = {}
+        for name, analysis in analyses.items():
+            for item, value in pd.Series(analysis(info), dtype=object).items():
+                results[(name, item)] = value
+    finally:
+        # Release every view of the shared blocks before closing them.
+        cohort = info = numeric_values = code_values = None
+        numeric_memory.close()
+        code_memory.close()
+    return results
+
+
+class CohortRunner:
+    """
+    Initialise class for running DataFrameInfo analyses on every cohort of a table, such as each loan_status or grade.
+
+    The table is grouped once: its rows are ordered by cohort, so each cohort is a contiguous slice. When run, the
+    numeric columns are copied once into a float64 shared memory block and every other column is stored as category
+    codes in a second block, so worker processes read their cohort from shared memory instead of receiving a copy.
+
+    Attributes:
+        table (pandas.DataFrame): the table to be analysed.
+        key (pandas.Series): the cohort of each row; rows with a missing cohort are left out.
+        cohorts (pandas.Index): the cohorts found, in sorted order.
+        order (NumPy array): the row positions of the table ordered by cohort.
+        boundaries (NumPy array): the start of each cohort's slice within order, followed by the total number of rows.
+    """
+    def __init__(self, table, by):
+        """
+        See help(CohortRunner) for accurate signature.
+
+        Args:
+            table(pandas.DataFrame): the table to be analysed.
+            by(str or pandas.Series): the column to group by, e.g. 'loan_status', or a Series of cohorts aligned with the table, e.g. the issue month.
+        """
+        self.table = table
+        self.key = table[by] if isinstance(by, str) else by
+        codes, self.cohorts = pd.factorize(self.key, sort=True)
+        # A stable sort keeps the rows of each cohort in their original order.
+        order = np.argsort(codes, kind='stable')
+        self.order = order[codes[order] >= 0]
+        self.boundaries = np.searchsorted(codes[self.order], np.arange(len(self.cohorts) + 1))
+
+    def run(self, analyses=None, n_jobs=None):
+        """
+        Run the analyses on every cohort, optionally across a pool of worker processes.
+
+        Args:
+            analyses(list or dict): the names of registered analyses, or functions keyed by name, defaulting to every registered analysis (optional).
+            n_jobs(int): the number of worker processes; the cohorts are analysed serially when not specified (optional).
+
+        Returns:
+            pandas.DataFrame: a row for each cohort, with a column for each analysis and item, e.g. ('mean', 'int_rate').
+        """
+        if analyses is None:
+            analyses = dict(ANALYSES)
+        elif not isinstance(analyses, dict):
+            analyses = {name: ANALYSES[name] for name in analyses}
+
+        numeric_columns = list(self.table.select_dtypes(include='number').columns)
+        code_columns = [column for column in self.table.columns if column not in numeric_columns]
+        numeric_memory = shared_memory.SharedMemory(create=True, size=max(len(numeric_columns) * len(self.order) * 8, 1))
+        code_memory = shared_memory.SharedMemory(create=True, size=max(len(code_columns) * len(self.order) * 4, 1))
+        try:
+            # Each column is one contiguous row of its block, so a cohort's slice of every column is a view.
+            numeric_values = np.ndarray((len(numeric_columns), len(self.order)), dtype='float64', buffer=numeric_memory.buf)
+            for index, column in enumerate(numeric_columns):
+                numeric_values[index] = self.table[column].to_numpy(dtype='float64', na_value=np.nan)[self.order]
+            code_values = np.ndarray((len(code_columns), len(self.order)), dtype='int32', buffer=code_memory.buf)
+            categories = []
+            for index, column in enumerate(code_columns):
+                if isinstance(self.table[column].dtype, pd.CategoricalDtype):
+                    codes, uniques = self.table[column].cat.codes.to_numpy(), self.table[column].cat.categories
+                else:
+                    codes, uniques = pd.factorize(self.table[column])
+                code_values[index] = codes[self.order]
+                categories.append(uniques)
+
+            layout = {
+                'numeric_columns': numeric_columns, 'code_columns': code_columns, 'categories': categories,
+                'numeric_name': numeric_memory.name, 'numeric_shape': (len(numeric_columns), len(self.order)),
+                'code_name': code_memory.name, 'code_shape': (len(code_columns), len(self.order)),
+            }
+            starts, stops = self.boundaries[:-1], self.boundaries[1:]
+            tasks = [[layout] * len(starts), starts, stops, [analyses] * len(starts)]
+            if n_jobs is None or n_jobs == 1:
+                results = list(map(_run_cohort, *tasks))
+            else:
+                with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                    results = list(executor.map(_run_cohort, *tasks, chunksize=max(len(starts) // (n_jobs * 4), 1)))
+        finally:
+            numeric_values = code_values = None
+            numeric_memory.close()
+            numeric_memory.unlink()
+            code_memory.close()
+            code_memory.unlink()
+
+        results = pd.DataFrame(results, index=pd.Index(self.cohorts, name=self.key.name))
+        if len(results.columns):
+            results.columns = pd.MultiIndex.from_tuples(results.columns, names=['analysis', 'item'])
+        return results.infer_objects()
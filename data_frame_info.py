@@ -1,8 +1,8 @@
 # Import necessary modules
-from scipy import stats
+from portfolio_metrics import RECOVERY_COLUMNS, recovery_percentages
 
 
-from scipy.stats import chi2_contingency
+from scipy import stats
 
 
 import numpy as np
@@ -14,15 +14,185 @@ import pandas as pd
 import matplotlib
 
 
+import weakref
+
+
+# The statistics provided for each column by DataFrameInfo.profile.
+PROFILE_STATISTICS = ['null_count', 'percentage_null_values', 'mode', 'mean', 'skew', 'min', 'max', 'lower_quartile', 'median', 'upper_quartile']
+
+
+def chi_square_statistics(observed):
+    """
+    Compute the Chi-square test of independence for a contingency table, matching scipy.stats.chi2_contingency.
+    Rows and columns without any observations are removed first, as pandas.crosstab would omit them.
+
+    Args:
+        observed(NumPy array): a two-dimensional table of observed counts.
+
+    Returns:
+        tuple: the Chi-square statistic, p-value, degrees of freedom and Cramér's V (from the uncorrected statistic).
+    """
+    observed = observed[observed.sum(axis=1) > 0][:, observed.sum(axis=0) > 0].astype('float64')
+    total = observed.sum()
+    dof = max(observed.shape[0] - 1, 0) * max(observed.shape[1] - 1, 0)
+    if dof == 0:
+        return 0.0, 1.0, 0, np.nan
+    expected = np.outer(observed.sum(axis=1), observed.sum(axis=0)) / total
+    uncorrected_chi2 = ((observed - expected) ** 2 / expected).sum()
+    chi2 = uncorrected_chi2
+    if dof == 1:
+        # Yates' continuity correction, applied by chi2_contingency to 2x2 tables.
+        difference = expected - observed
+        corrected = observed + np.sign(difference) * np.minimum(0.5, np.abs(difference))
+        chi2 = ((corrected - expected) ** 2 / expected).sum()
+    cramers_v = np.sqrt(uncorrected_chi2 / (total * min(observed.shape[0] - 1, observed.shape[1] - 1)))
+    return chi2, stats.chi2.sf(chi2, dof), dof, cramers_v
+
+
+def theils_u(observed):
+    """
+    Compute Theil's uncertainty coefficient U(x|y) for a contingency table with x on the rows and y on the columns.
+
+    Args:
+        observed(NumPy array): a two-dimensional table of observed counts.
+
+    Returns:
+        float: the fraction of the entropy of x explained by y, between 0 and 1.
+    """
+    total = observed.sum()
+    if total == 0:
+        return np.nan
+    joint = observed[observed > 0] / total
+    row_probabilities = observed.sum(axis=1) / total
+    column_probabilities = np.broadcast_to(observed.sum(axis=0) / total, observed.shape)[observed > 0]
+    row_probabilities = row_probabilities[row_probabilities > 0]
+    entropy_x = -(row_probabilities * np.log(row_probabilities)).sum()
+    if entropy_x == 0:
+        return 1.0
+    conditional_entropy = -(joint * np.log(joint / column_probabilities)).sum()
+    return (entropy_x - conditional_entropy) / entropy_x
+
+
 class DataFrameInfo():
     """
     Initialise class for deriving information about a dataframe.
+
+    Column statistics are memoised per column. Cached values are discarded automatically when rows or columns
+    are added or removed, and when a column is replaced, e.g. by table['int_rate'] = table['int_rate'].fillna(0).
+    Writes into a column's existing values, such as table.loc[rows, 'int_rate'] = 0 or fillna(inplace=True), are not
+    detected: reads after such a write can return stale values until invalidate() is called with the modified columns.
+
+    Attributes:
+        dataframe (pandas.DataFrame): the dataframe to be described.
+        cache_hits (int): the number of column statistics served from the cache.
+        cache_misses (int): the number of column statistics computed from the dataframe.
     """
     def __init__(self, dataframe):
         """
         See help(DataFrameInfo) for accurate signature.
         """
         self.dataframe = dataframe
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = {}
+        self._fingerprint = self._get_fingerprint()
+
+    def _get_fingerprint(self):
+        """
+        Identify the dataframe object, its row count and its columns, which change whenever rows or columns are added or removed.
+        """
+        return id(self.dataframe), len(self.dataframe.index), tuple(self.dataframe.columns)
+
+    def _column_token(self, column_name):
+        """
+        Identify the array holding a column's values, which changes whenever the column is replaced.
+        Returns a weak reference to the array, so replaced arrays are not kept alive, and for NumPy columns the address of the column within it.
+        """
+        column = self.dataframe[column_name]
+        if isinstance(column.dtype, np.dtype):
+            values = column.to_numpy()
+            address = values.__array_interface__['data'][0]
+            while isinstance(values.base, np.ndarray):
+                values = values.base
+        else:
+            values, address = column.array, None
+        try:
+            return weakref.ref(values), address
+        except TypeError:
+            # An array that cannot be weakly referenced is never treated as unchanged.
+            return (lambda: None), address
+
+    def _is_current(self, key, token):
+        """
+        Check that a statistic is cached and was computed from the array currently holding its column.
+        """
+        entry = self._cache.get(key)
+        if entry is None:
+            return False
+        cached_values = entry[1][0]()
+        return cached_values is not None and cached_values is token[0]() and entry[1][1] == token[1]
+
+    def _cached_statistic(self, statistic, column_names, compute):
+        """
+        Provide a statistic for each column, computing the uncached columns together in a single call.
+
+        Args:
+            statistic(str): the name of the statistic used as part of the cache key.
+            column_names(str or list): a column name, or a list of column names.
+            compute(function): takes a list of column names and returns the statistic indexed or keyed by column name.
+
+        Returns:
+            the value for a single column name, or a dictionary of values keyed by column name for a list of column names.
+        """
+        if self._get_fingerprint() != self._fingerprint:
+            self.invalidate()
+        single_column = not isinstance(column_names, (list, tuple, pd.Index))
+        columns = [column_names] if single_column else list(column_names)
+
+        # Entries computed from an array the column no longer holds are stale, as the column has been replaced since.
+        tokens = {column: self._column_token(column) for column in columns}
+        missing_columns = [column for column in columns if not self._is_current((statistic, column), tokens[column])]
+        if statistic in PROFILE_STATISTICS:
+            # Statistics already computed by profile() are read from its cached rows rather than recomputed.
+            for column in [column for column in missing_columns if self._is_current(('profile', column), tokens[column])]:
+                self._cache[(statistic, column)] = (self._cache[('profile', column)][0][statistic], tokens[column])
+            missing_columns = [column for column in missing_columns if not self._is_current((statistic, column), tokens[column])]
+        self.cache_hits += len(columns) - len(missing_columns)
+        self.cache_misses += len(missing_columns)
+        if missing_columns:
+            results = compute(missing_columns)
+            for column in missing_columns:
+                value = results[column] if isinstance(results, dict) else results.loc[column]
+                self._cache[(statistic, column)] = (value, tokens[column])
+
+        if single_column:
+            return self._cache[(statistic, column_names)][0]
+        return {column: self._cache[(statistic, column)][0] for column in columns}
+
+    def invalidate(self, columns=None):
+        """
+        Discard cached statistics after the dataframe has been modified.
+        Only needed after values are written into a column's existing array, e.g. with .loc or inplace=True; replaced columns
+        are detected automatically. Until then, reads of the modified columns can return stale values.
+
+        Args:
+            columns(list): the column names whose values changed, or every column if not specified (optional).
+        """
+        if columns is None:
+            self._cache.clear()
+        else:
+            columns = set(columns)
+            self._cache = {key: value for key, value in self._cache.items() if key[1] not in columns}
+        self._fingerprint = self._get_fingerprint()
+
+    def cache_info(self):
+        """
+        Provide the cache hit and miss counts.
+
+        Returns:
+            dict: the number of hits, misses and cached entries.
+        """
+        return {'hits': self.cache_hits, 'misses': self.cache_misses, 'entries': len(self._cache)}
 
     def find_column_types(self, *columns):
         """
@@ -63,7 +233,7 @@ class DataFrameInfo():
             for column in columns:
                 return self.dataframe[column].value_counts()
         else:
-            categorical_columns = self.dataframe.select_dtypes(include=['object'])
+            categorical_columns = self.dataframe.select_dtypes(include=['object', 'category'])
             all_categories = {}
             for column in categorical_columns:
                 all_categories[column] = categorical_columns[column].value_counts()
@@ -85,13 +255,50 @@ class DataFrameInfo():
         Return:
             pandas.Series: the percentage of null values against each column of the table input.
         """
-        all_null_percentages = {}
-        for column in self.dataframe:
-            all_null_percentages[column] = self.dataframe[column].isnull().sum() * 100 / len(self.dataframe)
-        null_percentages_table = pd.DataFrame.from_dict(all_null_percentages, orient='index', columns=['percentage_null_values'])
+        null_counts = self._cached_statistic('null_count', list(self.dataframe.columns), lambda columns: self.dataframe[columns].isnull().sum())
+        null_percentages_table = (pd.Series(null_counts, dtype='float64') * 100 / len(self.dataframe)).to_frame('percentage_null_values')
         null_percentages_table = null_percentages_table.sort_values(by='percentage_null_values', ascending=False)
         return null_percentages_table.round(2)
     
+    def profile(self, columns=None):
+        """
+        Compute the null counts, mean, median, mode, skew, min, max and quartiles of columns in one vectorised pass.
+        Results are memoised per column, so later calls only scan columns that have not been profiled since they last changed,
+        and get_column_mean, get_median, get_mode, column_skew and percentage_null_values read profiled columns from the same results.
+        Statistics other than the null counts and mode are only computed for numeric columns.
+
+        Args:
+            columns(list): a list of column names to be profiled, or every column if not specified (optional).
+
+        Returns:
+            pandas.DataFrame: a table of statistics indexed by column name.
+        """
+        columns = list(self.dataframe.columns) if columns is None else list(columns)
+        rows = self._cached_statistic('profile', columns, self._compute_profile)
+        return pd.DataFrame.from_dict(rows, orient='index').reindex(index=columns, columns=PROFILE_STATISTICS)
+
+    def _compute_profile(self, columns):
+        """
+        Compute the profile statistics of the specified columns, indexed by column name.
+        """
+        data = self.dataframe[columns]
+        numeric_data = data.select_dtypes(include='number')
+        profile = pd.DataFrame(index=columns)
+        profile['null_count'] = data.isnull().sum()
+        profile['percentage_null_values'] = profile['null_count'] * 100 / len(data)
+        profile['mode'] = self._compute_modes(columns)
+        profile = profile.join(numeric_data.agg(['mean', 'skew', 'min', 'max']).T)
+        quartiles = numeric_data.quantile([0.25, 0.5, 0.75]).T
+        quartiles.columns = ['lower_quartile', 'median', 'upper_quartile']
+        return profile.join(quartiles)
+
+    def _compute_modes(self, columns):
+        """
+        Compute the first mode of each specified column, indexed by column name.
+        """
+        modes = self.dataframe[columns].mode()
+        return modes.iloc[0] if len(modes) else pd.Series(np.nan, index=columns)
+
     def get_column_mean(self, column_name):
         """
         Calculate the mean of each specified column in the table input.
@@ -102,8 +309,8 @@ class DataFrameInfo():
         Provides:
             int: the calculated mean based on the provided columns rounded to 0 significant figures.
         """
-        column = self.dataframe[column_name]
-        return column.mean(skipna=True).round(0)
+        means = self._cached_statistic('mean', column_name, lambda columns: self.dataframe[columns].mean(skipna=True))
+        return np.round(pd.Series(means, dtype='float64') if isinstance(means, dict) else means, 0)
     
     def column_skew(self, *column_names):
         """
@@ -115,13 +322,13 @@ class DataFrameInfo():
         Returns:
             pandas.Series: the skew scores against each specified column of the table input.
         """
+        compute = lambda columns: self.dataframe[columns].skew(numeric_only=True)
         if column_names:
-            skew = []
-            for column in column_names:
-                skew = self.dataframe[column].skew(numeric_only=True)
-            return skew
+            # The skew of the last specified column is returned, as before memoisation.
+            return self._cached_statistic('skew', column_names[-1], compute)
         else:
-            return self.dataframe.skew(numeric_only=True)
+            numeric_columns = list(self.dataframe.select_dtypes(include='number').columns)
+            return pd.Series(self._cached_statistic('skew', numeric_columns, compute), dtype='float64')
     
     def get_mode(self, column_names):
         """
@@ -133,7 +340,8 @@ class DataFrameInfo():
         Returns:
             float: the value of the mode for the specified table column input.
         """
-        return self.dataframe[column_names].mode().values[0]
+        modes = self._cached_statistic('mode', column_names, self._compute_modes)
+        return pd.Series(modes) if isinstance(modes, dict) else modes
     
     def get_median(self, column_names):
         """
@@ -145,16 +353,45 @@ class DataFrameInfo():
         Returns:
             float: the value of the median for the specified table column input.
         """
-        return self.dataframe[column_names].median()
+        medians = self._cached_statistic('median', column_names, lambda columns: self.dataframe[columns].median())
+        return pd.Series(medians, dtype='float64') if isinstance(medians, dict) else medians
     
-    def get_histogram(self):
+    def compute_histograms(self, columns=None, bins=50):
+        """
+        Bin numeric columns with NumPy, so histograms are drawn from the bin counts rather than from every value.
+        Results are memoised per column and number of bins.
+
+        Args:
+            columns(list): a list of numeric column names, or every numeric column if not specified (optional).
+            bins(int): the number of equal-width bins for each column.
+
+        Returns:
+            dict: a tuple of the bin counts and bin edges keyed by column name.
+        """
+        columns = list(self.dataframe.select_dtypes(include='number').columns) if columns is None else list(columns)
+        return self._cached_statistic(f'histogram_{bins}', columns, lambda columns: {column: self._bin_column(column, bins) for column in columns})
+
+    def _bin_column(self, column_name, bins):
+        """
+        Count the non-null values of a column in equal-width bins.
+        """
+        values = self.dataframe[column_name].to_numpy(dtype='float64', na_value=np.nan)
+        return np.histogram(values[np.isfinite(values)], bins=bins)
+
+    def get_histogram(self, columns=None, bins=50):
         """
         Generate histogram of provided dataframe.
-        
+
+        Args:
+            columns(list): a list of numeric column names to be plotted, or every numeric column if not specified (optional).
+            bins(int): the number of bins for each column.
+
         Returns:
             NumPy array: histogram of the provided dataframe.
         """
-        return self.dataframe.hist(figsize=(15,20))
+        # Imported here so headless runs never load the plotting libraries.
+        from plotter import Plotter
+        return Plotter(self.dataframe).histograms(self.compute_histograms(columns, bins))
 
     def get_zscores(self):
         """
@@ -176,18 +413,90 @@ class DataFrameInfo():
             overall_percentage_recovered(numpy.float64): the percentage of the investor-funded portion of loans repaid by customers.
             percentage_recovered_after_6_months(numpy.float64): the percentage of the total amount paid after 6 months of installments from all customers.
         """
-        total_loans = self.dataframe['funded_amount'].sum()
-        total_amount_recovered = total_loans - self.dataframe['out_prncp'].sum()
-        total_amount_invested = self.dataframe['funded_amount_inv'].sum()
-        total_investments_recovered = total_amount_invested - self.dataframe['out_prncp_inv'].sum()
-        percentage_investments_recovered = (total_investments_recovered / total_amount_invested * 100).round(2)
-        overall_percentage_recovered = (total_amount_recovered / total_loans * 100).round(2)
-        total_amount_paid_after_6_months = self.dataframe['instalment'].sum() * 6
-        percentage_recovered_after_6_months = (total_amount_paid_after_6_months / total_loans * 100).round(2)
+        # Only five column sums are needed, so the table is not grouped as PortfolioMetrics does.
+        recoveries = recovery_percentages(self.dataframe[RECOVERY_COLUMNS].sum(), months=6)
+        overall_percentage_recovered = recoveries['Loans Recovered']
+        percentage_investments_recovered = recoveries['Investments Recovered']
+        percentage_recovered_after_6_months = recoveries['Loans Recovered\n After 6 months']
         print(f'The proportion of loan investments recovered is {percentage_investments_recovered}%.')
         print(f'The proportion of whole loans recovered is {overall_percentage_recovered}%.')
         print(f'6 months of customer instalments will result in {percentage_recovered_after_6_months}% loan recovery.')
-        return {'Loans Recovered':overall_percentage_recovered, 'Investments Recovered':percentage_investments_recovered, 'Loans Recovered\n After 6 months': percentage_recovered_after_6_months}
+        return recoveries
+
+    def encode_column(self, column_name):
+        """
+        Encode a column as integer codes, cached until the column changes.
+
+        Args:
+            column_name(str): the name of the column to be encoded.
+
+        Returns:
+            tuple: a NumPy array of codes, with -1 for null values, and the array of distinct values the codes refer to.
+        """
+        return self._cached_statistic('codes', column_name, lambda columns: {column: pd.factorize(self.dataframe[column]) for column in columns})
+
+    def chi_square_scan(self, risk_factors, segments=None, status_column='loan_status'):
+        """
+        Test the relationship between loan_status and many risk-factor columns across several loan_status segments in one pass.
+
+        Each column is encoded once and a single loan_status by risk-factor contingency table is counted per factor;
+        each segment's table is the subset of its rows for the statuses in that segment.
+
+        Args:
+            risk_factors(list): a list of columns representing potential risk factors for late loan payments.
+            segments(dict): segment names mapped to lists of loan_status values, or to None for every loan (optional).
+            status_column(str): the column defining the segments.
+
+        Returns:
+            Pandas dataframe: the Chi-square statistic, p-value, degrees of freedom and Cramér's V of every segment and risk factor.
+        """
+        segments = segments or {'All': None}
+        status_codes, statuses = self.encode_column(status_column)
+        segment_rows = {name: np.ones(len(statuses), dtype=bool) if selected is None else np.isin(np.asarray(statuses), selected)
+                        for name, selected in segments.items()}
+
+        results = []
+        for risk_column in risk_factors:
+            factor_codes, levels = self.encode_column(risk_column)
+            valid = (status_codes >= 0) & (factor_codes >= 0)
+            counts = np.bincount(status_codes[valid] * len(levels) + factor_codes[valid], minlength=len(statuses) * len(levels))
+            contingency_table = counts.reshape(len(statuses), len(levels))
+            for name, rows in segment_rows.items():
+                chi2, p, dof, cramers_v = chi_square_statistics(contingency_table[rows])
+                results.append([name, risk_column, chi2, p, dof, cramers_v])
+        return pd.DataFrame(results, columns=['Segment', 'Risk Factor', 'Chi-square Statistic', 'p-value', 'Degrees of Freedom', "Cramér's V"])
+
+    def association_matrix(self, columns, method='cramers_v'):
+        """
+        Measure the association between every pair of categorical columns without modifying the dataframe.
+
+        Each column is encoded once (and cached), then each pair's contingency table is counted from the shared codes.
+
+        Args:
+            columns(list): a list of categorical column names.
+            method(str): 'cramers_v' for the symmetric Cramér's V, or 'theils_u' for the asymmetric uncertainty coefficient,
+                where the entry in row x and column y is the fraction of the uncertainty in x explained by y.
+
+        Returns:
+            pandas.DataFrame: a matrix of association scores between 0 and 1, indexed by column name on both axes.
+        """
+        if method not in ('cramers_v', 'theils_u'):
+            raise ValueError(f"Unknown association method '{method}', expected 'cramers_v' or 'theils_u'.")
+        encodings = [self.encode_column(column) for column in columns]
+        matrix = np.eye(len(columns))
+
+        for i, (codes_x, levels_x) in enumerate(encodings):
+            for j, (codes_y, levels_y) in enumerate(encodings):
+                if i == j or (method == 'cramers_v' and j < i):
+                    continue
+                valid = (codes_x >= 0) & (codes_y >= 0)
+                counts = np.bincount(codes_x[valid] * len(levels_y) + codes_y[valid], minlength=len(levels_x) * len(levels_y))
+                contingency_table = counts.reshape(len(levels_x), len(levels_y))
+                if method == 'cramers_v':
+                    matrix[i, j] = matrix[j, i] = chi_square_statistics(contingency_table)[3]
+                else:
+                    matrix[i, j] = theils_u(contingency_table)
+        return pd.DataFrame(matrix, index=columns, columns=columns)
 
     def chi_square_test(self, customer_type, risk_factors):
         """
@@ -200,11 +509,7 @@ class DataFrameInfo():
         Returns:
             Pandas dataframe: a table containing the Chi-square statistic and p-value for set of tested columns.
         """
-        statistics = pd.DataFrame(columns=['Risk Factor', 'Chi-square Statistic', 'p-value'])
-        for risk_column in risk_factors:
-            contingency_table = pd.crosstab(customer_type['loan_status'], customer_type[risk_column])
-            chi2, p, dof, expected = chi2_contingency(contingency_table)
-            print(f"Statistical comparison between {risk_column} and loan_status provides a Chi-square statistic of {chi2} and a p-value of {p}")
-            new_row = [{'Risk Factor': risk_column, 'Chi-square Statistic': chi2, 'p-value': p}]
-            statistics.loc[len(statistics.index)] = [risk_column, chi2, p]
-        return statistics
+        statistics = DataFrameInfo(customer_type).chi_square_scan(risk_factors)
+        for row in statistics.itertuples(index=False):
+            print(f"Statistical comparison between {row[1]} and loan_status provides a Chi-square statistic of {row[2]} and a p-value of {row[3]}")
+        return statistics[['Risk Factor', 'Chi-square Statistic', 'p-value']]
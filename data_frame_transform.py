@@ -5,19 +5,28 @@ from data_frame_info import DataFrameInfo
 from scipy import stats
 
 
-import matplotlib
-
-
-import matplotlib.pyplot as plt
-
-
 import pandas as pd
 
 
 import numpy as np
 
 
-import seaborn as sns
+from concurrent.futures import ProcessPoolExecutor
+
+
+def fit_lambda(method, values):
+    """
+    Fit the lambda of a Box-Cox or Yeo-Johnson transform by maximum likelihood, as stats.boxcox and stats.yeojohnson do.
+    Defined at module level so it can be sent to worker processes.
+    Args:
+        method(str): 'boxcox' or 'yeojohnson'.
+        values(numpy.ndarray): the column values to be fitted.
+    Returns:
+        float: the fitted lambda.
+    """
+    if method == 'boxcox':
+        return float(stats.boxcox_normmax(values + 1e-10, method='mle'))
+    return float(stats.yeojohnson_normmax(values))
 
 
 class DataFrameTransform:
@@ -27,13 +36,29 @@ class DataFrameTransform:
     Attributes:
         table (Pandas DataFrame): the dataframe to be transformed.
         find_info (Python Class): the DataFrameInfo class initialised with this instance of the dataframe for providing information relating to the dataframe.
+        fitted_lambdas (dict): the Box-Cox or Yeo-Johnson lambda used for each transformed column, for reuse on new data.
+        skew_diagnostics (pandas.DataFrame): the skew before and after, lambda and output column of each column in the latest skew transform.
+        copy_on_write (bool): whether the table input is left untouched, with each method replacing only the columns it modifies in a shallow copy.
     """
-    def __init__(self, table):
-        self.table = table
+    def __init__(self, table, copy_on_write=False):
+        """
+        See help(DataFrameTransform) for accurate signature.
+
+        Args:
+            table(pandas.DataFrame): the dataframe to be transformed.
+            copy_on_write(bool): work on a shallow copy of the table, which shares the data of unmodified columns,
+                so the table input is never changed and no defensive copy of it is needed (optional).
+        """
+        self.copy_on_write = copy_on_write
+        # Every method below assigns new column objects rather than writing into existing arrays, so a shallow copy is enough.
+        self.table = table.copy(deep=False) if copy_on_write else table
         self.find_info = DataFrameInfo(self.table)
+        self.fitted_lambdas = {}
+        self.skew_diagnostics = None
        
     def drop_columns(self, columns):
         self.table.drop(columns, axis=1, inplace=True, errors='ignore')
+        self.find_info.invalidate(columns)
         return self.table
         
     def impute_with_mean(self, columns):
@@ -44,9 +69,10 @@ class DataFrameTransform:
         Returns:
             pandas.Dataframe: the table input transformed by replacement of null values with the mean of the respective column.
         """
+        means = self.find_info.get_column_mean(list(columns))
         for column_name in columns:
-            mean = self.find_info.get_column_mean(column_name)
-            self.table[column_name].fillna(mean, inplace=True)
+            self.table[column_name] = self.table[column_name].fillna(means[column_name])
+        self.find_info.invalidate(columns)
         return self.table
     
     def impute_with_mode(self, columns):
@@ -57,9 +83,10 @@ class DataFrameTransform:
         Returns:
             pandas.Dataframe: the table input transformed by replacement of null values with the mode of the respective column.
         """
+        modes = self.find_info.get_mode(list(columns))
         for column_name in columns:
-            mode = self.find_info.get_mode(column_name)
-            self.table[column_name].fillna(mode, inplace=True)
+            self.table[column_name] = self.table[column_name].fillna(modes[column_name])
+        self.find_info.invalidate(columns)
         return self.table
     
     def impute_with_median(self, columns):
@@ -70,9 +97,10 @@ class DataFrameTransform:
         Returns:
             pandas.Dataframe: the table input transformed by replacement of null values with the median of the respective column.
         """
+        medians = self.find_info.get_median(list(columns))
         for column_name in columns:
-            median = self.find_info.get_median(column_name)
-            self.table[column_name].fillna(median, inplace=True)
+            self.table[column_name] = self.table[column_name].fillna(medians[column_name])
+        self.find_info.invalidate(columns)
         return self.table
 
     def drop_rows(self, columns):
@@ -83,59 +111,152 @@ class DataFrameTransform:
         Returns:
             pandas.Dataframe: the table input transformed by removal of null-containing rows.
         """
+        row_count = len(self.table)
         self.table.dropna(subset=columns, inplace=True)
+        if len(self.table) != row_count:
+            self.find_info.invalidate()
         return self.table
     
-    def boxcox_transform(self, skew_table):
+    def fit_lambdas(self, columns, method='yeojohnson', n_jobs=None):
+        """
+        Fit the Box-Cox or Yeo-Johnson lambda of each column, optionally across a pool of worker processes.
+        Args:
+            columns(list): the column names to be fitted.
+            method(str): 'boxcox' or 'yeojohnson'.
+            n_jobs(int): the number of worker processes; the columns are fitted serially when not specified (optional).
+        Returns:
+            dict: the fitted lambda of each column.
+        """
+        samples = [self.table[column].to_numpy(dtype='float64') for column in columns]
+        if n_jobs is None or n_jobs == 1 or len(columns) < 2:
+            lambdas = [fit_lambda(method, sample) for sample in samples]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                lambdas = list(executor.map(fit_lambda, [method] * len(columns), samples))
+        return dict(zip(columns, lambdas))
+
+    def boxcox_transform(self, skew_table, n_jobs=None, lambdas=None, plot=True):
         """
         Perform box-cox transform upon skewed data in the table input.
-        Produces histogram to visualise the data transformation.
+        Produces histogram to visualise the data transformation unless plot is False.
         Args:
             skew_table(pandas.Series): a series of skew scores for columns within the loan_payments table.
+            n_jobs(int): the number of worker processes used to fit the lambdas; fitted serially when not specified (optional).
+            lambdas(dict): previously fitted lambdas keyed by column name, reused instead of refitting those columns (optional).
+            plot(bool): draw the histograms; set to False for headless runs and render skew_diagnostics with Plotter later.
         Returns:
             pandas.DataFrame: the table input in which columns with skew have been transformed by the box-cox method.
         """
-        for column, skew in skew_table.items():
-            if skew > 1:
-                boxcox_sample = self.table[column]
-                boxcox_sample = boxcox_sample + 1e-10
-                boxcox_transform, _ = stats.boxcox(boxcox_sample, lmbda=None)
-                boxcox_data = pd.Series(boxcox_transform, name=f'{column}_boxcox')
-                self.table = pd.concat([self.table, boxcox_data], axis=1)
-                plot = sns.histplot(boxcox_data, label=f'Skewness: {boxcox_data.skew():.2f}')
-        plot.legend()  
+        columns = [column for column, skew in skew_table.items() if skew > 1]
+        lambdas = dict(lambdas or {})
+        lambdas.update(self.fit_lambdas([column for column in columns if column not in lambdas], 'boxcox', n_jobs))
+        self.fitted_lambdas.update({column: lambdas[column] for column in columns})
+
+        new_columns = {}
+        for column in columns:
+            boxcox_transform = stats.boxcox(self.table[column] + 1e-10, lmbda=lambdas[column])
+            boxcox_data = pd.Series(boxcox_transform, index=self.table.index, name=f'{column}_boxcox')
+            new_columns[boxcox_data.name] = boxcox_data
+        self._record_skew_diagnostics(skew_table, lambdas, {column: f'{column}_boxcox' for column in columns}, new_columns)
+        if new_columns:
+            # The new columns are added in one concat rather than one copy of the table per column, and the existing columns are not copied.
+            self.table = pd.concat([self.table, pd.DataFrame(new_columns, index=self.table.index)], axis=1, copy=False)
+        # Point the statistics at the rebound table, keeping the cached statistics of the unchanged columns.
+        self.find_info.dataframe = self.table
+        self.find_info.invalidate(list(new_columns))
+        if plot:
+            self._plot_skew_diagnostics()
         return self.table
         
-    def yeojohnson_transform(self, skew_table):
+    def yeojohnson_transform(self, skew_table, n_jobs=None, lambdas=None, plot=True):
         """
         Perform Yeo-Johnson method on table input in order to transform columns with skew scored at over 1.
-        Produces histogram to visualise the data transformation.
+        Produces histogram to visualise the data transformation unless plot is False.
         Args:
             skew_table(pandas.Series): a series of skew scores for columns within the loan_payments table.
+            n_jobs(int): the number of worker processes used to fit the lambdas; fitted serially when not specified (optional).
+            lambdas(dict): previously fitted lambdas keyed by column name, reused instead of refitting those columns (optional).
+            plot(bool): draw the histograms; set to False for headless runs and render skew_diagnostics with Plotter later.
         Returns:
             pandas.DataFrame: the table input in which columns with skew have been transformed via the Yeo-Johnson method.
         """
-        for column, skew in skew_table.items():
-            if skew > 1:  
-                yeojohnson_data = self.table[column]
-                yeojohnson_data = stats.yeojohnson(yeojohnson_data)
-                yeojohnson_data= pd.Series(yeojohnson_data[0])
-                self.table[column] = yeojohnson_data
-                plot=sns.histplot(yeojohnson_data,label="Skewness: %.2f"%(yeojohnson_data.skew()))
-                plot.legend()
+        columns = [column for column, skew in skew_table.items() if skew > 1]
+        lambdas = dict(lambdas or {})
+        lambdas.update(self.fit_lambdas([column for column in columns if column not in lambdas], 'yeojohnson', n_jobs))
+        self.fitted_lambdas.update({column: lambdas[column] for column in columns})
+
+        transformed_columns = {}
+        for column in columns:
+            transformed_columns[column] = pd.Series(stats.yeojohnson(self.table[column].to_numpy(dtype='float64'), lmbda=lambdas[column]), index=self.table.index)
+        self._record_skew_diagnostics(skew_table, lambdas, {column: column for column in columns}, transformed_columns)
+        for column, yeojohnson_data in transformed_columns.items():
+            self.table[column] = yeojohnson_data
+        self.find_info.invalidate(columns)
+        if plot:
+            self._plot_skew_diagnostics()
         return self.table
+
+    def _record_skew_diagnostics(self, skew_table, lambdas, output_columns, transformed_columns):
+        """
+        Save the skew before and after, lambda and output column of each transformed column in skew_diagnostics.
+        """
+        self.skew_diagnostics = pd.DataFrame({
+            'skew_before': [skew_table[column] for column in output_columns],
+            'skew_after': [transformed_columns[output_column].skew() for output_column in output_columns.values()],
+            'lambda': [lambdas[column] for column in output_columns],
+            'output_column': list(output_columns.values()),
+        }, index=pd.Index(list(output_columns), name='column'))
+
+    def _plot_skew_diagnostics(self):
+        """
+        Draw histograms of the latest transformed columns with their new skew scores.
+        """
+        # Imported here so headless runs never load the plotting libraries.
+        from plotter import Plotter
+        return Plotter(self.table).skew_histograms(self.skew_diagnostics)
         
-    def impute_outliers(self):
+    def impute_outliers(self, z_threshold=3, method='zscore'):
         """
         Impute outliers with z-scores over 3 in high skew columns with the median.
+        Args:
+            z_threshold(float): the z-score above which a value is treated as an outlier.
+            method(str): 'zscore' to detect outliers by z-score, or 'iqr' to use the interquartile range fence.
         Returns:
             pandas.DataFrame: the table input in which skewed data has been transformed by imputing outlier values with the median of the respective column.
         """
-        skew_table = self.find_info.column_skew()
-        for column_name, data in self.table.select_dtypes(include='number').items():
-            if skew_table.loc[column_name] > 1:
-                for index, z_score in enumerate(stats.zscore(self.table[column_name])):
-                    if z_score > 3:
-                        median = self.find_info.get_median(column_name)
-                        self.table.iloc[index, self.table.columns.get_loc(column_name)] = median
-        return self.table
\ No newline at end of file
+        self.replace_outliers(z_threshold=z_threshold, method=method)
+        return self.table
+
+    def replace_outliers(self, columns=None, z_threshold=3, method='zscore', iqr_multiplier=1.5):
+        """
+        Replace high outliers with the median of their column across all specified columns in one vectorised pass.
+        Args:
+            columns(list): the column names to be checked for outliers, defaulting to every numeric column with a skew over 1 (optional).
+            z_threshold(float): the z-score above which a value is treated as an outlier by the 'zscore' method.
+            method(str): 'zscore' to detect outliers by z-score, or 'iqr' to flag values above the upper quartile plus iqr_multiplier interquartile ranges.
+            iqr_multiplier(float): the number of interquartile ranges above the upper quartile at which the 'iqr' method flags outliers.
+        Returns:
+            pandas.Series: the number of values replaced in each column.
+        """
+        if columns is None:
+            skew_table = self.find_info.column_skew()
+            columns = [column for column in self.table.select_dtypes(include='number') if skew_table.loc[column] > 1]
+        if not columns:
+            return pd.Series(dtype='int64')
+        data = self.table[columns]
+
+        if method == 'zscore':
+            outliers = (data - data.mean()) / data.std(ddof=0) > z_threshold
+        elif method == 'iqr':
+            lower_quartile, upper_quartile = data.quantile(0.25), data.quantile(0.75)
+            outliers = data > upper_quartile + iqr_multiplier * (upper_quartile - lower_quartile)
+        else:
+            raise ValueError(f"Unknown outlier method '{method}', expected 'zscore' or 'iqr'.")
+
+        # Label-based masking keeps the replacement correct when drop_rows has left gaps in the index.
+        replaced = data.mask(outliers, self.find_info.get_median(columns), axis=1)
+        # Columns are assigned one at a time, which replaces each column rather than writing into arrays shared with the table input.
+        for column in columns:
+            self.table[column] = replaced[column]
+        self.find_info.invalidate(columns)
+        return outliers.sum()
@@ -2,9 +2,83 @@
 from datetime import datetime
 
 
+import numpy as np
+
+
 import pandas as pd
 
 
+# The columns of the loan_payments table holding MMM-YYYY date strings.
+DATE_COLUMNS = ['last_payment_date', 'next_payment_date', 'last_credit_pull_date', 'issue_date', 'earliest_credit_line']
+
+# Every MMM-YYYY string parsed so far, shared across date columns and DataTransform instances.
+_parsed_dates = pd.Series(dtype='period[M]')
+
+
+def convert_date_columns(loan_payments, column_names):
+    """
+    Convert date columns from MMM-YYYY strings to monthly periods, parsing each distinct string only once.
+    Columns already converted to periods are left untouched, so repeated calls cost nothing.
+    Args:
+        loan_payments(pandas.DataFrame): a table of loans containing date columns.
+        column_names(list): a list of names for the date columns in the loan_payments table.
+    Returns:
+        pandas.DataFrame: the table with the date columns in the MM-YYYY format.
+    """
+    global _parsed_dates
+    pending_columns = [column for column in column_names if not isinstance(loan_payments[column].dtype, pd.PeriodDtype)]
+    if not pending_columns:
+        return loan_payments
+
+    # Look up the values of every pending column in a single call against the shared table of parsed strings.
+    values = loan_payments[pending_columns].to_numpy(dtype=object).ravel(order='F')
+    positions = _parsed_dates.index.get_indexer(values)
+    unparsed = values[(positions == -1) & pd.notna(values)]
+    if len(unparsed):
+        unparsed = pd.unique(unparsed)
+        parsed = pd.Series(pd.to_datetime(unparsed, format='%b-%Y').to_period('M'), index=unparsed)
+        _parsed_dates = pd.concat([_parsed_dates, parsed])
+        positions = _parsed_dates.index.get_indexer(values)
+
+    # Missing values have no position in the lookup and are filled with NaT.
+    periods = _parsed_dates.array.take(positions, allow_fill=True)
+    row_count = len(loan_payments)
+    for index, column in enumerate(pending_columns):
+        loan_payments[column] = periods[index * row_count:(index + 1) * row_count]
+    return loan_payments
+
+
+def compact_column(column, max_category_ratio=0.05):
+    """
+    Convert a column to the most memory-compact dtype that holds its values without loss.
+    Args:
+        column(pandas.Series): the column to be converted.
+        max_category_ratio(float): the largest ratio of distinct values to rows at which text is stored as a category.
+    Returns:
+        pandas.Series: the column with categorical text, the smallest lossless integer or float width, and nullable integers where nulls are present.
+    """
+    if column.dtype == object:
+        if column.nunique(dropna=True) <= max_category_ratio * len(column):
+            return column.astype('category')
+        return column
+    if pd.api.types.is_bool_dtype(column) or not pd.api.types.is_numeric_dtype(column):
+        return column
+    if pd.api.types.is_integer_dtype(column):
+        return pd.to_numeric(column, downcast='integer')
+
+    values = column.dropna()
+    if len(values) and (values == np.floor(values)).all() and values.abs().max() < 2 ** 53:
+        smallest_integer = pd.to_numeric(values.astype('int64'), downcast='integer').dtype
+        if len(values) < len(column):
+            # Nullable integers keep the missing values, e.g. 'int8' becomes 'Int8'.
+            return column.astype(smallest_integer.name.capitalize())
+        return column.astype(smallest_integer)
+    single_precision = column.astype('float32')
+    if ((single_precision.astype('float64') == column) | column.isna()).all():
+        return single_precision
+    return column
+
+
 class DataTransform:
     """
     Initialise class for converting columns to correct the format.
@@ -24,10 +98,32 @@ class DataTransform:
         Returns:
             pandas.DataFrame: the loan payments table with the 'term' column in float64 format.
         """
+        if pd.api.types.is_numeric_dtype(self.loan_payments['term']):
+            return self.loan_payments
         self.loan_payments['term'] = self.loan_payments['term'].str.split(' ').str[0]
         self.loan_payments['term'] = self.loan_payments['term'].astype('float64')
         return self.loan_payments
         
+    def compact_dtypes(self, max_category_ratio=0.05):
+        """
+        Downcast every column of the loan payments dataframe to its most memory-compact lossless dtype.
+        Intended to run once cleaning is finished, as nullable integer columns only accept integer fill values.
+        The per-column memory report is saved in the memory_report attribute.
+        Args:
+            max_category_ratio(float): the largest ratio of distinct values to rows at which text is stored as a category.
+        Returns:
+            pandas.DataFrame: the loan payments table with compacted dtypes.
+        """
+        dtypes_before = self.loan_payments.dtypes
+        bytes_before = self.loan_payments.memory_usage(index=False, deep=True)
+        for column in self.loan_payments.columns:
+            self.loan_payments[column] = compact_column(self.loan_payments[column], max_category_ratio)
+        bytes_after = self.loan_payments.memory_usage(index=False, deep=True)
+
+        self.memory_report = pd.DataFrame({'dtype_before': dtypes_before, 'dtype_after': self.loan_payments.dtypes,
+                                           'bytes_before': bytes_before, 'bytes_after': bytes_after})
+        return self.loan_payments
+
     def convert_to_date(self, loan_payments, column_name):
         """
         Convert date columns from MMM-YY to datetime format.
@@ -37,8 +133,7 @@ class DataTransform:
         Returns:
             pandas.DataFrame: a table with all inputted date columns in the MM-YYYY format.
         """
-        loan_payments[column_name] = pd.to_datetime(loan_payments[column_name], format='%b-%Y').dt.to_period('M')
-        return loan_payments
+        return convert_date_columns(loan_payments, [column_name])
 
     def iterate_through_columns(self):
         """
@@ -46,9 +141,4 @@ class DataTransform:
         Returns:
             pandas.DataFrame: a table with all the date columns specified in 'column_names' converted to datetime format via the convert_to_date method.
         """
-        column_names = ['last_payment_date', 'next_payment_date', 'last_credit_pull_date', 'issue_date', 'earliest_credit_line']
-
-        for names in column_names:
-            self.convert_to_date(self.loan_payments, names)
-        
-        return self.loan_payments
\ No newline at end of file
+        return convert_date_columns(self.loan_payments, DATE_COLUMNS)
\ No newline at end of file
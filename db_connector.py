@@ -2,127 +2,381 @@
 from sqlalchemy import create_engine
 
 
+import sqlalchemy
+
+
+import argparse
+
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+import os
+
+
 import pandas as pd
 
 
+import threading
+
+
+import time
+
+
 import yaml
- 
 
-# Restrict usage of the RDSDataBase class and the retrieve() function to this file.
+
+# Re-exported so existing imports of the table loaders from this module keep working.
+from table_loader import open_table, open_null_removed_table, open_transformed_table, open_latest_table, read_table, save_snapshot, SnapshotWriter
+
+
+# The loan_status values of loans that can no longer change; every other loan in the local snapshot is checked for changes on each sync.
+SETTLED_STATUSES = ['Fully Paid', 'Charged Off', 'Does not meet the credit policy. Status:Fully Paid', 'Does not meet the credit policy. Status:Charged Off']
+
+# The columns compared between the local snapshot and the database to detect changes to open loans.
+CHANGE_COLUMNS = ['loan_status', 'last_payment_date', 'next_payment_date', 'out_prncp', 'total_payment', 'total_rec_late_fee', 'recoveries']
+
+
 class RDSDatabaseConnector:
     """
     Initialise class for data extraction from an RDS database.
 
     Attributes:
         credentials (.yaml file): a file containing the credential details necessary from access to the RDS database.
+        pool_size (int): the number of connections kept open in the engine's connection pool.
+        max_overflow (int): the number of extra connections allowed beyond pool_size under load.
+        pool_pre_ping (bool): test each pooled connection before use so dropped connections are replaced transparently.
+        pool_recycle (int): the number of seconds after which pooled connections are replaced.
     """
 
-    def __init__(self, credentials):
+    def __init__(self, credentials, pool_size=5, max_overflow=10, pool_pre_ping=True, pool_recycle=1800):
         """
         See help(RDSDatabaseConnector) for accurate signature.
         """
         self.credentials = credentials
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_pre_ping = pool_pre_ping
+        self.pool_recycle = pool_recycle
+        self.engine = None
+        self._engine_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.dispose()
 
     def initialise_details(self):
         """
         Initialise the connection details and pass into an SQLAlchemy engine.
+        The engine is created on first use and then reused, so every query shares its connection pool.
         Returns:
             Engine: SQLAlchemy engine for use in the database_connection method.
         """
-        # Assign variables for the PostgreSQL database connection credentials.
-        database_type = 'postgresql'
-        dbapi = 'psycopg2'
-        host = self.credentials['RDS_HOST']
-        password = self.credentials['RDS_PASSWORD']
-        user = self.credentials['RDS_USER']
-        database = self.credentials['RDS_DATABASE']
-        port = self.credentials['RDS_PORT']
-
-        # Create and return sqlalchemy engine using the connection credentials.
-        engine = create_engine(f"{database_type}+{dbapi}://{user}:{password}@{host}:{port}/{database}")
-        return engine
-    
+        with self._engine_lock:
+            if self.engine is None:
+                # Assign variables for the PostgreSQL database connection credentials.
+                database_type = 'postgresql'
+                dbapi = 'psycopg2'
+                host = self.credentials['RDS_HOST']
+                password = self.credentials['RDS_PASSWORD']
+                user = self.credentials['RDS_USER']
+                database = self.credentials['RDS_DATABASE']
+                port = self.credentials['RDS_PORT']
+
+                # Create the pooled sqlalchemy engine using the connection credentials.
+                self.engine = create_engine(f"{database_type}+{dbapi}://{user}:{password}@{host}:{port}/{database}",
+                                            pool_size=self.pool_size, max_overflow=self.max_overflow,
+                                            pool_pre_ping=self.pool_pre_ping, pool_recycle=self.pool_recycle)
+        return self.engine
+
+    def dispose(self):
+        """
+        Close every pooled connection and discard the engine; a new engine is created on the next query.
+        """
+        with self._engine_lock:
+            if self.engine is not None:
+                self.engine.dispose()
+                self.engine = None
+
+    def read_query(self, query, params=None):
+        """
+        Run an SQL query through the pooled engine.
+        Args:
+            query(str): the SQL query to be run, with bound parameters written as :name.
+            params(dict): values for the bound parameters in the query (optional).
+        Returns:
+            pandas.DataFrame: the rows returned by the query.
+        """
+        with self.initialise_details().connect() as conn:
+            return pd.read_sql_query(sqlalchemy.text(query), conn, params=params)
+
+    def run_queries(self, queries, max_workers=None):
+        """
+        Run several SQL queries concurrently, each on its own connection from the pool.
+        Args:
+            queries(list): SQL query strings or (query, params) tuples.
+            max_workers(int): the number of queries run at once, defaulting to the pool size (optional).
+        Returns:
+            list: a pandas.DataFrame of results for each query, in the order given.
+        """
+        queries = [(query, None) if isinstance(query, str) else query for query in queries]
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size) as executor:
+            return list(executor.map(lambda query: self.read_query(*query), queries))
+
     def database_connection(self):
         """
         Connect to RDS Database to retrieve the loan_payments table.
         Returns:
             pandas.Dataframe: a table containing multiple loans and associated data.
         """
+        return pd.concat(self.stream_table(), ignore_index=True)
+
+    def stream_table(self, table_name='loan_payments', columns=None, where=None, params=None, chunksize=50000):
+        """
+        Stream a table from the RDS database in bounded-size chunks via a server-side cursor.
+        Args:
+            table_name(str): the name of the table to be retrieved.
+            columns(list): the column names to be selected, or every column if not specified (optional).
+            where(str): an SQL predicate used to filter the rows, e.g. "loan_status = :status" (optional).
+            params(dict): values for the bound parameters referenced in the where predicate (optional).
+            chunksize(int): the maximum number of rows held in each chunk.
+        Yields:
+            pandas.DataFrame: consecutive chunks of the table, each with at most chunksize rows.
+        """
+        table = sqlalchemy.table(table_name, *[sqlalchemy.column(name) for name in columns or []])
+        query = sqlalchemy.select(*table.columns) if columns else sqlalchemy.select(sqlalchemy.literal_column('*')).select_from(table)
+        if where:
+            query = query.where(sqlalchemy.text(where))
+
         engine = self.initialise_details()
-        with engine.execution_options(isolation_level='AUTOCOMMIT').connect() as conn:
-            loan_payments = pd.read_sql_table('loan_payments', engine)
-            return loan_payments
+        # stream_results keeps the rows on the server until each chunk is requested.
+        with engine.connect().execution_options(stream_results=True, max_row_buffer=chunksize) as conn:
+            for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunksize):
+                yield chunk
 
-    def save_file(self):
+    def save_file(self, file_name='loan_payments.csv', chunksize=50000, **stream_options):
         """
         Save the loan_payments dataframe as a CSV file to the local directory.
         Enables efficient table access in the EDA project.
+        The table is written chunk by chunk, together with a Parquet snapshot for fast loading with open_table,
+        so memory usage does not grow with the number of rows.
+        Args:
+            file_name(str): the name of the CSV file to be written.
+            chunksize(int): the maximum number of rows held in memory at once.
+            stream_options: further keyword arguments for the stream_table method, e.g. columns or where (optional).
         """
-        loan_payments = self.database_connection()
-        loan_payments.to_csv('loan_payments.csv', index=False)
+        with SnapshotWriter(file_name) as writer:
+            for chunk in self.stream_table(chunksize=chunksize, **stream_options):
+                writer.write(chunk)
 
+    def partitioned_extract(self, table_name='loan_payments', key='id', partitions=8, max_workers=None, output_dir=None, chunksize=50000):
+        """
+        Extract a table in parallel by splitting it into key ranges fetched concurrently through the connection pool.
+        Range boundaries are the key's quantiles, so partitions hold similar row counts even when the key is unevenly spread.
+        Args:
+            table_name(str): the name of the table to be retrieved.
+            key(str): a numeric column used to split the table, e.g. 'id'. Text columns such as the MMM-YYYY dates sort alphabetically, so their ranges would not be date ranges.
+            partitions(int): the number of key ranges the table is split into.
+            max_workers(int): the number of partitions fetched at once, defaulting to the pool size (optional).
+            output_dir(str): a directory to write each partition to as a separate CSV file, instead of concatenating them (optional).
+            chunksize(int): the maximum number of rows held in each fetched chunk.
+        Returns:
+            tuple: the concatenated pandas.DataFrame (or the list of partition file names when output_dir is given),
+                and a pandas.DataFrame of rows fetched and seconds taken for each partition.
+        """
+        fractions = ', '.join(str(index / partitions) for index in range(1, partitions))
+        boundaries = []
+        if fractions:
+            query = f'SELECT percentile_disc(ARRAY[{fractions}]::float8[]) WITHIN GROUP (ORDER BY {key}) AS boundaries FROM {table_name}'
+            # Repeated boundaries would only produce empty partitions, so they are removed.
+            boundaries = list(dict.fromkeys(value for value in self.read_query(query)['boundaries'][0] or [] if value is not None))
 
-def retrieve():
-    """
-    Load the credentials yaml file from the local directory.
-    Returns:
-        yaml file: a file containing the credentials
-    """
-    with open('credentials.yaml', 'r') as file:
-        credentials = yaml.safe_load(file)
-    
-    return credentials
+        predicates = []
+        for index in range(len(boundaries) + 1):
+            conditions, params = [], {}
+            if index > 0:
+                conditions.append(f'{key} >= :low')
+                params['low'] = boundaries[index - 1]
+            if index < len(boundaries):
+                conditions.append(f'{key} < :high')
+                params['high'] = boundaries[index]
+            where = ' AND '.join(conditions) or 'TRUE'
+            if index == len(boundaries):
+                # Rows without a key would match no range, so they are fetched with the last partition.
+                where = f'({where}) OR {key} IS NULL'
+            predicates.append((index, where, params))
 
-# Open the locally saved credentials yaml file for access to the RDS database.
-credentials = retrieve()
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
 
-# Call the RDSDatabaseConnector Class with the credentials yaml file.
-connect_to_database = RDSDatabaseConnector(credentials)
+        def fetch_partition(partition):
+            index, where, params = partition
+            start = time.perf_counter()
+            chunks = self.stream_table(table_name, where=where, params=params, chunksize=chunksize)
+            if output_dir:
+                result = os.path.join(output_dir, f'{table_name}_part_{index}.csv')
+                rows = 0
+                with open(result, 'w', newline='') as file:
+                    for chunk_index, chunk in enumerate(chunks):
+                        chunk.to_csv(file, header=(chunk_index == 0), index=False)
+                        rows += len(chunk)
+            else:
+                result = pd.concat(chunks, ignore_index=True)
+                rows = len(result)
+            return result, {'partition': index, 'predicate': where, 'rows': rows, 'seconds': time.perf_counter() - start}
 
-# Call the save_file method to retrieve and save loan_payments.csv to the local directory.
-connect_to_database.save_file()
+        with ThreadPoolExecutor(max_workers=max_workers or min(len(predicates), self.pool_size)) as executor:
+            results, timings = zip(*executor.map(fetch_partition, predicates))
 
+        timings = pd.DataFrame(list(timings))
+        if output_dir:
+            return list(results), timings
+        return pd.concat(results, ignore_index=True), timings
 
-def open_table():
-    """
-    Load loan_payments CSV file as dataframe from local directory.
-    Returns:
-        pandas.DataFrame: a table of loan data to be used in the EDA project.
-    """
-    with open('loan_payments.csv', 'r') as file:
-        saved_loan_payments_table = pd.read_csv(file)
-    return saved_loan_payments_table
+    def sync_file(self, file_name='loan_payments.csv', state_file='sync_state.yaml', key='id', date_column='last_payment_date', chunksize=50000,
+                  status_column='loan_status', settled_statuses=SETTLED_STATUSES, change_columns=CHANGE_COLUMNS, batch_size=1000):
+        """
+        Incrementally update the local loan_payments CSV file instead of re-downloading the whole table.
+        A high-water mark of the largest key and the latest payment month is kept in state_file.
+        Rows with a larger key are new and fetched in full. Loans that are still open in the local snapshot can change
+        without a new payment, e.g. by becoming late or being charged off, so their change_columns are fetched and
+        compared with the snapshot; only the loans that differ are fetched in full. Settled loans are never refetched.
+        The new and changed rows are upserted into the local file, which is left untouched when nothing changed.
+        A full download is performed when either the CSV file or the state file is missing.
+        Args:
+            file_name(str): the name of the local CSV snapshot.
+            state_file(str): the name of the YAML file holding the high-water mark.
+            key(str): the integer primary key column used for the upsert.
+            date_column(str): the MMM-YYYY formatted column recording the latest payment of each loan.
+            chunksize(int): the maximum number of rows held in each fetched chunk.
+            status_column(str): the column recording the status of each loan.
+            settled_statuses(list): the statuses of loans that can no longer change.
+            change_columns(list): the columns compared to detect changes to open loans.
+            batch_size(int): the maximum number of keys listed in each query for open or changed loans.
+        Returns:
+            int: the number of new or changed rows fetched from the database.
+        """
+        if not (os.path.exists(file_name) and os.path.exists(state_file)):
+            watermark = {key: None, date_column: None}
+            with SnapshotWriter(file_name) as writer:
+                for chunk in self.stream_table(chunksize=chunksize):
+                    writer.write(chunk)
+                    watermark = self._update_watermark(watermark, chunk, key, date_column)
+            self._save_watermark(state_file, watermark)
+            return writer.rows
 
+        with open(state_file, 'r') as file:
+            watermark = yaml.safe_load(file)
 
-def open_null_removed_table():
-    """
-    Load null-removed loan_payments CSV file as dataframe from local directory.
-    Returns:
-        pandas.DataFrame: a table of loan data without null values.
-    """
-    with open('null_removed_table.csv', 'r') as file:
-        no_null_loan_payments_table = pd.read_csv(file)
-    return no_null_loan_payments_table
+        where = f'{key} > :last_key' if watermark[key] is not None else f'{key} IS NOT NULL'
+        fetched = [pd.concat(self.stream_table(where=where, params={'last_key': watermark[key]}, chunksize=chunksize), ignore_index=True)]
+
+        compared_columns = list(dict.fromkeys([status_column] + list(change_columns)))
+        local = read_table(file_name, columns=[key] + compared_columns)
+        local = local[~local[status_column].isin(settled_statuses)].set_index(key)
+        changed_keys = []
+        for batch in self._key_batches(local.index, key, batch_size):
+            remote = pd.concat(self.stream_table(columns=[key] + compared_columns, where=batch, chunksize=chunksize), ignore_index=True).set_index(key)
+            stored = local.loc[local.index.intersection(remote.index), compared_columns]
+            differs = (self._as_text(stored) != self._as_text(remote.loc[stored.index, compared_columns])).any(axis=1)
+            changed_keys.extend(differs.index[differs])
+        for batch in self._key_batches(changed_keys, key, batch_size):
+            fetched.append(pd.concat(self.stream_table(where=batch, chunksize=chunksize), ignore_index=True))
+
+        changes = pd.concat(fetched, ignore_index=True)
+        if changes.empty:
+            return 0
+
+        snapshot = read_table(file_name)
+        merged = pd.concat([snapshot[~snapshot[key].isin(changes[key])], changes], ignore_index=True)
+        # Write to a temporary file first so an interrupted sync never leaves a partial snapshot.
+        merged.to_csv(f'{file_name}.tmp', index=False)
+        os.replace(f'{file_name}.tmp', file_name)
+        # Saved after the CSV file, so read_table sees the snapshot as current.
+        save_snapshot(merged, file_name)
+        self._save_watermark(state_file, self._update_watermark(watermark, changes, key, date_column))
+        return len(changes)
 
+    @staticmethod
+    def _as_text(table):
+        """
+        Convert values to text with missing values as empty strings, so a column read back with a different dtype
+        or null marker can at most cause an extra refetch.
+        """
+        table = table.astype(object)
+        return table.where(table.notna(), '').astype(str)
+
+    @staticmethod
+    def _key_batches(keys, key, batch_size):
+        """
+        Provide WHERE clauses selecting the specified integer keys, at most batch_size keys per clause.
+        The keys are written as integer literals, so no bind parameter is needed per key.
+        """
+        keys = [int(value) for value in keys]
+        for start in range(0, len(keys), batch_size):
+            yield f"{key} IN ({', '.join(str(value) for value in keys[start:start + batch_size])})"
+
+    @staticmethod
+    def _update_watermark(watermark, chunk, key, date_column):
+        """
+        Advance the high-water mark with the largest key and latest month found in a chunk.
+        """
+        if chunk.empty:
+            return watermark
+        latest_key = chunk[key].max()
+        latest_month = pd.to_datetime(chunk[date_column], format='%b-%Y').max()
+        if watermark[key] is None or latest_key > watermark[key]:
+            watermark[key] = int(latest_key)
+        if pd.notna(latest_month):
+            latest_month = latest_month.to_period('M')
+            if watermark[date_column] is None or latest_month > pd.Period(watermark[date_column], freq='M'):
+                watermark[date_column] = str(latest_month)
+        return watermark
+
+    @staticmethod
+    def _save_watermark(state_file, watermark):
+        """
+        Save the high-water mark to the local state file.
+        """
+        with open(state_file, 'w') as file:
+            yaml.safe_dump(watermark, file)
 
-def open_transformed_table():
+
+def retrieve():
     """
-    Load transformed loan_payments CSV file as dataframe from local directory.
+    Load the credentials yaml file from the local directory.
     Returns:
-        pandas.DataFrame: a table of loan data transformed by imputation, data removal and skew correction.
+        yaml file: a file containing the credentials
     """
-    with open('transformed_table.csv', 'r') as file:
-        transformed_loan_payments_table = pd.read_csv(file)
-    return transformed_loan_payments_table
+    with open('credentials.yaml', 'r') as file:
+        credentials = yaml.safe_load(file)
+    
+    return credentials
 
 
-def open_latest_table():
+def extract(full=False):
     """
-    Load latest transformation of the loan_payments file in the local directory.
+    Retrieve the loan_payments table from the RDS database and save it to the local directory.
+    Args:
+        full(bool): re-download the whole table instead of incrementally syncing the local copy.
     Returns:
-        pandas.DataFrame: a table of loan data transformed by imputation, data removal, skew correction and outlier imputation.
+        int: the number of rows fetched from the database, or None when the whole table was re-downloaded.
     """
-    with open('refined_table.csv', 'r') as file:
-        latest_loan_payments_table = pd.read_csv(file)
-    return latest_loan_payments_table
-    
\ No newline at end of file
+    # Open the locally saved credentials yaml file for access to the RDS database.
+    credentials = retrieve()
+
+    # Call the RDSDatabaseConnector Class with the credentials yaml file; its connection pool is closed on exit.
+    with RDSDatabaseConnector(credentials) as connect_to_database:
+        if full:
+            # Call the save_file method to retrieve and save loan_payments.csv to the local directory.
+            return connect_to_database.save_file()
+        # Call the sync_file method to retrieve or incrementally update loan_payments.csv in the local directory.
+        return connect_to_database.sync_file()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Retrieve the loan_payments table from the RDS database into loan_payments.csv.')
+    parser.add_argument('--full', action='store_true', help='re-download the whole table instead of incrementally syncing the local copy')
+    arguments = parser.parse_args()
+    extract(full=arguments.full)
@@ -0,0 +1,157 @@
+# Import necessary modules
+from data_frame_transform import DataFrameTransform
+
+
+from scipy import stats
+
+
+import json
+
+
+import numpy as np
+
+
+import pandas as pd
+
+
+def _to_builtin(value):
+    """
+    Convert a NumPy scalar to the equivalent Python value so it can be saved as JSON.
+    """
+    if pd.isna(value):
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class FittedTransform:
+    """
+    Initialise a cleaning transform whose parameters are fitted once on a reference table and reused on new batches of loans.
+
+    fit runs the DataFrameTransform steps in copy-on-write mode, leaving the reference table untouched, and records every parameter they derive:
+    the imputation fill values, the skew transform lambdas and the outlier thresholds. transform applies those
+    parameters to a new batch without recomputing anything from it, so every batch is cleaned consistently.
+
+    Attributes:
+        drop_columns (list): the columns to be removed.
+        mean_columns (list): the columns whose nulls are imputed with the mean.
+        median_columns (list): the columns whose nulls are imputed with the median.
+        mode_columns (list): the columns whose nulls are imputed with the mode.
+        skew_method (str): 'yeojohnson' or 'boxcox', or None to skip skew correction.
+        z_threshold (float): the z-score above which a value is treated as an outlier, or None to skip outlier imputation.
+        parameters (dict): the fitted parameters, set by fit or load.
+    """
+    def __init__(self, drop_columns=(), mean_columns=(), median_columns=(), mode_columns=(), skew_method='yeojohnson', z_threshold=3):
+        """
+        See help(FittedTransform) for accurate signature.
+        """
+        self.drop_columns = list(drop_columns)
+        self.mean_columns = list(mean_columns)
+        self.median_columns = list(median_columns)
+        self.mode_columns = list(mode_columns)
+        self.skew_method = skew_method
+        self.z_threshold = z_threshold
+        self.parameters = None
+
+    def fit(self, table):
+        """
+        Fit the transform parameters on a reference table, which is not modified.
+        Args:
+            table(pandas.DataFrame): the reference table, e.g. the full loan history.
+        Returns:
+            FittedTransform: this instance, with parameters set.
+        """
+        transform = DataFrameTransform(table, copy_on_write=True)
+        transform.drop_columns(self.drop_columns)
+        fill_values = {}
+        if self.mean_columns:
+            fill_values.update(transform.find_info.get_column_mean(list(self.mean_columns)).to_dict())
+            transform.impute_with_mean(self.mean_columns)
+        if self.median_columns:
+            fill_values.update(transform.find_info.get_median(list(self.median_columns)).to_dict())
+            transform.impute_with_median(self.median_columns)
+        if self.mode_columns:
+            fill_values.update(transform.find_info.get_mode(list(self.mode_columns)).to_dict())
+            transform.impute_with_mode(self.mode_columns)
+
+        lambdas = {}
+        if self.skew_method == 'boxcox':
+            transform.boxcox_transform(transform.find_info.column_skew(), plot=False)
+            lambdas = transform.fitted_lambdas
+        elif self.skew_method == 'yeojohnson':
+            transform.yeojohnson_transform(transform.find_info.column_skew(), plot=False)
+            lambdas = transform.fitted_lambdas
+
+        outliers = {}
+        if self.z_threshold is not None:
+            # The same columns and statistics that DataFrameTransform.replace_outliers would use on the reference table.
+            skew_table = transform.find_info.column_skew()
+            columns = [column for column in transform.table.select_dtypes(include='number') if skew_table.loc[column] > 1]
+            data = transform.table[columns]
+            outliers = {column: {'mean': _to_builtin(data[column].mean()), 'std': _to_builtin(data[column].std(ddof=0)),
+                                 'median': _to_builtin(data[column].median())} for column in columns}
+
+        self.parameters = {
+            'drop_columns': self.drop_columns,
+            'fill_values': {column: _to_builtin(value) for column, value in fill_values.items()},
+            'skew_method': self.skew_method,
+            'lambdas': {column: _to_builtin(value) for column, value in lambdas.items()},
+            'z_threshold': self.z_threshold,
+            'outliers': outliers,
+        }
+        return self
+
+    def transform(self, batch):
+        """
+        Apply the fitted parameters to a new batch of loans, which is not modified.
+        Args:
+            batch(pandas.DataFrame): a table with the same columns as the reference table.
+        Returns:
+            pandas.DataFrame: the cleaned batch.
+        """
+        if self.parameters is None:
+            raise ValueError('FittedTransform must be fitted or loaded before transform is called.')
+        parameters = self.parameters
+        batch = batch.drop(parameters['drop_columns'], axis=1, errors='ignore')
+        batch = batch.fillna({column: value for column, value in parameters['fill_values'].items() if value is not None})
+
+        new_columns = {}
+        for column, lmbda in parameters['lambdas'].items():
+            values = batch[column].to_numpy(dtype='float64')
+            if parameters['skew_method'] == 'boxcox':
+                new_columns[f'{column}_boxcox'] = stats.boxcox(values + 1e-10, lmbda=lmbda)
+            else:
+                new_columns[column] = stats.yeojohnson(values, lmbda=lmbda)
+        if new_columns:
+            batch = batch.assign(**{column: pd.Series(values, index=batch.index) for column, values in new_columns.items()})
+
+        for column, outlier in parameters['outliers'].items():
+            if outlier['std']:
+                outliers = (batch[column] - outlier['mean']) / outlier['std'] > parameters['z_threshold']
+                batch[column] = batch[column].mask(outliers, outlier['median'])
+        return batch
+
+    def save(self, file_name):
+        """
+        Save the fitted parameters to a JSON file.
+        Args:
+            file_name(str): the name of the JSON file to be written.
+        """
+        if self.parameters is None:
+            raise ValueError('FittedTransform must be fitted before it is saved.')
+        with open(file_name, 'w') as file:
+            json.dump(self.parameters, file, indent=2)
+
+    @classmethod
+    def load(cls, file_name):
+        """
+        Load fitted parameters saved by save.
+        Args:
+            file_name(str): the name of the JSON file.
+        Returns:
+            FittedTransform: a transform ready to be applied to new batches.
+        """
+        with open(file_name, 'r') as file:
+            parameters = json.load(file)
+        fitted_transform = cls(drop_columns=parameters['drop_columns'], skew_method=parameters['skew_method'], z_threshold=parameters['z_threshold'])
+        fitted_transform.parameters = parameters
+        return fitted_transform
@@ -0,0 +1,212 @@
+# Import necessary modules
+from contextlib import contextmanager
+
+
+import functools
+
+
+import inspect
+
+
+import json
+
+
+import threading
+
+
+import time
+
+
+import tracemalloc
+
+
+import pandas as pd
+
+
+# The attributes holding the table of each instrumented class, used to count rows.
+TABLE_ATTRIBUTES = ['table', 'dataframe', 'loan_payments']
+
+# Every recorded call, in the order the calls finished.
+records = []
+
+# The original methods replaced while instrumentation is on, keyed by class and method name.
+_original_methods = {}
+
+# The peak traced memory of the calls currently running in each thread, so nested calls do not hide their parent's peak.
+_local = threading.local()
+
+_started_tracemalloc = False
+
+
+def default_classes():
+    """
+    Provide the classes instrumented when none are specified.
+    Returns:
+        list: DataTransform, DataFrameTransform, DataFrameInfo and RDSDatabaseConnector.
+    """
+    from data_frame_info import DataFrameInfo
+    from data_frame_transform import DataFrameTransform
+    from data_transform import DataTransform
+    from db_connector import RDSDatabaseConnector
+    return [DataTransform, DataFrameTransform, DataFrameInfo, RDSDatabaseConnector]
+
+
+def _count_rows(value):
+    """
+    Provide the number of rows of a table, or of the table held by an instance of an instrumented class.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    for attribute in TABLE_ATTRIBUTES:
+        table = getattr(value, attribute, None)
+        if isinstance(table, (pd.DataFrame, pd.Series)):
+            return len(table)
+    return None
+
+
+def _instrumented(class_name, method_name, method):
+    """
+    Wrap a method so that each call records its wall time, CPU time, peak memory growth and rows in and out.
+    Each thread keeps its own stack of nested calls, but tracemalloc traces the whole process: under threads, such as
+    the pools of run_queries and partitioned_extract, the peak memory of a call includes allocations made by other
+    threads at the same time, and resetting the peak for one call also resets it for calls running concurrently.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not hasattr(_local, 'peak_stack'):
+            _local.peak_stack = []
+        peak_stack = _local.peak_stack
+        table_arguments = [argument for argument in args if isinstance(argument, pd.DataFrame)]
+        rows_in = _count_rows(table_arguments[0] if table_arguments else self)
+        memory_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        peak_stack.append(0)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            result = method(self, *args, **kwargs)
+        finally:
+            wall_seconds, cpu_seconds = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, peak_stack.pop())
+            if peak_stack:
+                # Pass the peak up, as this call reset the traced peak of the call that made it.
+                peak_stack[-1] = max(peak_stack[-1], peak)
+        rows_out = _count_rows(result)
+        records.append({
+            'class': class_name, 'method': method_name, 'depth': len(peak_stack),
+            'wall_seconds': wall_seconds, 'cpu_seconds': cpu_seconds,
+            'peak_memory_delta_mb': max(peak - memory_before, 0) / 1e6,
+            'rows_in': rows_in, 'rows_out': rows_out if rows_out is not None else _count_rows(self),
+        })
+        return result
+    return wrapper
+
+
+def enable(*classes):
+    """
+    Start recording every call to the public methods of the specified classes.
+    The methods are replaced with recording wrappers, and disable restores the originals, so nothing is added to calls while instrumentation is off.
+    Args:
+        classes(list): the classes to be instrumented, defaulting to default_classes() (optional).
+    """
+    global _started_tracemalloc
+    for cls in classes or default_classes():
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith('_') or not inspect.isfunction(attribute) or (cls, name) in _original_methods:
+                continue
+            _original_methods[(cls, name)] = attribute
+            setattr(cls, name, _instrumented(cls.__name__, name, attribute))
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+
+
+def disable():
+    """
+    Stop recording and restore the original methods of every instrumented class.
+    """
+    global _started_tracemalloc
+    for (cls, name), method in _original_methods.items():
+        setattr(cls, name, method)
+    _original_methods.clear()
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+
+
+@contextmanager
+def profiling(*classes):
+    """
+    Record calls to the public methods of the specified classes within a with block.
+    Args:
+        classes(list): the classes to be instrumented, defaulting to default_classes() (optional).
+    """
+    enable(*classes)
+    try:
+        yield
+    finally:
+        disable()
+
+
+def reset():
+    """
+    Discard every recorded call.
+    """
+    records.clear()
+
+
+def report():
+    """
+    Provide the recorded calls as a table.
+    Returns:
+        pandas.DataFrame: one row per call, with its class, method, nesting depth, timings, peak memory growth and rows in and out.
+    """
+    return pd.DataFrame(records, columns=['class', 'method', 'depth', 'wall_seconds', 'cpu_seconds', 'peak_memory_delta_mb', 'rows_in', 'rows_out'])
+
+
+def summary():
+    """
+    Summarise the recorded calls by method.
+    Returns:
+        pandas.DataFrame: the number of calls, total wall and CPU time and largest peak memory growth of each method.
+    """
+    return report().groupby(['class', 'method']).agg(
+        calls=('wall_seconds', 'size'), wall_seconds=('wall_seconds', 'sum'),
+        cpu_seconds=('cpu_seconds', 'sum'), peak_memory_delta_mb=('peak_memory_delta_mb', 'max'),
+    ).sort_values('wall_seconds', ascending=False)
+
+
+def save_report(file_name, label=None):
+    """
+    Save the recorded calls and their summary as a JSON run report.
+    Args:
+        file_name(str): the name of the JSON file to be written.
+        label(str): a name for the run, e.g. a commit or dataset (optional).
+    """
+    calls = report().astype(object)
+    run_report = {
+        'label': label,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'summary': summary().reset_index().to_dict(orient='records'),
+        'calls': calls.where(calls.notna(), None).to_dict(orient='records'),
+    }
+    with open(file_name, 'w') as file:
+        json.dump(run_report, file, indent=2)
+
+
+def compare_reports(baseline_file, current_file):
+    """
+    Compare the per-method totals of two saved run reports.
+    Args:
+        baseline_file(str): the JSON report of the reference run.
+        current_file(str): the JSON report of the run to be compared.
+    Returns:
+        pandas.DataFrame: the baseline and current totals of each method and the ratio of current to baseline wall time.
+    """
+    summaries = []
+    for file_name in (baseline_file, current_file):
+        with open(file_name, 'r') as file:
+            summaries.append(pd.DataFrame(json.load(file)['summary']).set_index(['class', 'method']))
+    comparison = summaries[0].join(summaries[1], how='outer', lsuffix='_baseline', rsuffix='_current')
+    comparison['wall_seconds_ratio'] = comparison['wall_seconds_current'] / comparison['wall_seconds_baseline']
+    return comparison.sort_values('wall_seconds_ratio', ascending=False)
@@ -0,0 +1,221 @@
+# Import necessary modules
+from data_frame_info import DataFrameInfo
+
+
+from data_frame_transform import DataFrameTransform
+
+
+from data_transform import DataTransform
+
+
+from table_loader import save_snapshot
+
+
+import hashlib
+
+
+import json
+
+
+import os
+
+
+import time
+
+
+import pandas as pd
+
+
+import yaml
+
+
+def convert_dates(table):
+    """
+    Convert the date columns of the table to the MM-YYYY period format.
+    """
+    return DataTransform(table).iterate_through_columns()
+
+
+def parse_term(table):
+    """
+    Convert the 'term' column of the table from strings to float64.
+    """
+    return DataTransform(table).remove_term_column_strings()
+
+
+def compact_dtypes(table, max_category_ratio=0.05):
+    """
+    Downcast every column of the table to its most memory-compact lossless dtype.
+    """
+    return DataTransform(table).compact_dtypes(max_category_ratio)
+
+
+def drop_columns(table, columns):
+    """
+    Remove the specified columns from the table.
+    """
+    return DataFrameTransform(table).drop_columns(columns)
+
+
+def drop_rows(table, columns):
+    """
+    Remove rows containing null values in the specified columns from the table.
+    """
+    return DataFrameTransform(table).drop_rows(columns)
+
+
+def impute_with_mean(table, columns):
+    """
+    Impute null values in the specified columns with the column mean.
+    """
+    return DataFrameTransform(table).impute_with_mean(columns)
+
+
+def impute_with_median(table, columns):
+    """
+    Impute null values in the specified columns with the column median.
+    """
+    return DataFrameTransform(table).impute_with_median(columns)
+
+
+def impute_with_mode(table, columns):
+    """
+    Impute null values in the specified columns with the column mode.
+    """
+    return DataFrameTransform(table).impute_with_mode(columns)
+
+
+def correct_skew(table, method='yeojohnson', n_jobs=None):
+    """
+    Transform every column with a skew over 1 by the 'yeojohnson' or 'boxcox' method, fitting the lambdas across n_jobs processes.
+    """
+    skew_table = DataFrameInfo(table).column_skew()
+    if method == 'boxcox':
+        return DataFrameTransform(table).boxcox_transform(skew_table, n_jobs=n_jobs, plot=False)
+    return DataFrameTransform(table).yeojohnson_transform(skew_table, n_jobs=n_jobs, plot=False)
+
+
+def impute_outliers(table, z_threshold=3, method='zscore'):
+    """
+    Impute outliers in high skew columns with the column median.
+    """
+    return DataFrameTransform(table).impute_outliers(z_threshold=z_threshold, method=method)
+
+
+# The operations available to pipeline stages, keyed by the name used in the stage configuration.
+OPERATIONS = {
+    'convert_dates': convert_dates,
+    'parse_term': parse_term,
+    'drop_columns': drop_columns,
+    'drop_rows': drop_rows,
+    'impute_with_mean': impute_with_mean,
+    'impute_with_median': impute_with_median,
+    'impute_with_mode': impute_with_mode,
+    'correct_skew': correct_skew,
+    'impute_outliers': impute_outliers,
+    'compact_dtypes': compact_dtypes,
+}
+
+
+class TransformPipeline:
+    """
+    Initialise a resumable pipeline of transformation stages with checkpointed outputs.
+
+    Each stage's output is saved under a hash of the input table and the configuration of that stage and every stage before it.
+    On a rerun the pipeline resumes from the latest stage whose checkpoint still matches, so changing one stage only reruns it and the stages after it.
+
+    A stage configuration is a dictionary such as:
+        {'operation': 'impute_with_median', 'params': {'columns': ['int_rate']}, 'save_as': 'null_removed_table.csv'}
+    where 'operation' is a key of OPERATIONS, 'params' (optional) are passed to the operation,
+    'name' (optional) labels the stage and 'save_as' (optional) also saves the stage output for the open_* table loaders.
+
+    Attributes:
+        stages (list): the stage configurations, run in order.
+        checkpoint_dir (str): the directory holding the checkpointed stage outputs.
+        last_run (list): the name, status and duration of each stage in the most recent run.
+    """
+    def __init__(self, stages, checkpoint_dir='checkpoints'):
+        """
+        See help(TransformPipeline) for accurate signature.
+        """
+        for stage in stages:
+            if stage['operation'] not in OPERATIONS:
+                raise ValueError(f"Unknown pipeline operation '{stage['operation']}', expected one of {sorted(OPERATIONS)}.")
+        self.stages = stages
+        self.checkpoint_dir = checkpoint_dir
+        self.last_run = []
+
+    @classmethod
+    def from_yaml(cls, file_name, checkpoint_dir='checkpoints'):
+        """
+        Load the stage configurations from a YAML file containing a 'stages' list.
+        Args:
+            file_name(str): the name of the YAML configuration file.
+            checkpoint_dir(str): the directory holding the checkpointed stage outputs.
+        Returns:
+            TransformPipeline: the configured pipeline.
+        """
+        with open(file_name, 'r') as file:
+            config = yaml.safe_load(file)
+        return cls(config['stages'], checkpoint_dir)
+
+    def stage_keys(self, table):
+        """
+        Compute the checkpoint key of every stage from the input table and the stage configurations.
+        Args:
+            table(pandas.DataFrame): the input table of the pipeline.
+        Returns:
+            list: a content hash for each stage, which changes whenever the input or any stage up to it changes.
+        """
+        table_hash = hashlib.sha256()
+        table_hash.update(json.dumps([list(map(str, table.columns)), list(map(str, table.dtypes))]).encode())
+        table_hash.update(pd.util.hash_pandas_object(table, index=True).values.tobytes())
+
+        keys = []
+        key = table_hash.hexdigest()
+        for stage in self.stages:
+            stage_config = {'operation': stage['operation'], 'params': stage.get('params', {})}
+            key = hashlib.sha256((key + json.dumps(stage_config, sort_keys=True, default=str)).encode()).hexdigest()
+            keys.append(key)
+        return keys
+
+    def _checkpoint_path(self, index, key):
+        """
+        Provide the checkpoint file name of a stage.
+        """
+        name = self.stages[index].get('name', self.stages[index]['operation'])
+        return os.path.join(self.checkpoint_dir, f'{index:02d}_{name}_{key[:16]}.pkl')
+
+    def run(self, table):
+        """
+        Run the pipeline, skipping every stage whose checkpoint matches its inputs and configuration.
+        The input table is not modified.
+        Args:
+            table(pandas.DataFrame): the input table of the pipeline, e.g. from open_table().
+        Returns:
+            pandas.DataFrame: the output table of the final stage.
+        """
+        keys = self.stage_keys(table)
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+
+        # Resume from the latest stage with a matching checkpoint, as every earlier stage is then unchanged too.
+        start = 0
+        for index in reversed(range(len(self.stages))):
+            if os.path.exists(self._checkpoint_path(index, keys[index])):
+                table = pd.read_pickle(self._checkpoint_path(index, keys[index]))
+                start = index + 1
+                break
+        else:
+            table = table.copy()
+
+        self.last_run = [{'stage': stage.get('name', stage['operation']), 'status': 'skipped', 'seconds': 0.0} for stage in self.stages[:start]]
+        for index in range(start, len(self.stages)):
+            stage = self.stages[index]
+            start_time = time.perf_counter()
+            table = OPERATIONS[stage['operation']](table, **stage.get('params', {}))
+            table.to_pickle(self._checkpoint_path(index, keys[index]))
+            if 'save_as' in stage:
+                table.to_csv(stage['save_as'], index=False)
+                save_snapshot(table, stage['save_as'])
+            self.last_run.append({'stage': stage.get('name', stage['operation']), 'status': 'ran', 'seconds': time.perf_counter() - start_time})
+        return table
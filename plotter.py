@@ -8,40 +8,132 @@ import matplotlib.pyplot as plt
 import missingno as msno
 
 
+import numpy as np
+
+
+import pandas as pd
+
+
 import plotly.express as px
 
 
 import seaborn as sns
 
 
+def _hexbin(x, y, color=None, label=None, **kwargs):
+    """
+    Draw a hexbin panel of a PairGrid, which passes a color and label that plt.hexbin does not accept.
+    """
+    return plt.hexbin(x, y, mincnt=1, cmap='Blues', **kwargs)
+
+
 class Plotter:
     """
     Initialise the class for visualising data insights.
 
+    Tables larger than sample_size are downsampled before row-level plots such as the pair plot and missing data matrix
+    are drawn. With a stratify column, each of its values keeps its share of the sample.
+
     Attributes:
         table (Pandas dataframe): specified dataframe to be visualised.
+        sample_size (int): the maximum number of rows drawn in row-level plots, or None to draw every row.
+        stratify (str): a column whose values keep their proportions in the sample, e.g. 'loan_status' (optional).
+        random_state (int): the seed used to draw the sample, so repeated plots show the same rows.
     """
-    def __init__(self, table):
+    def __init__(self, table, sample_size=None, stratify=None, random_state=0):
         """
         See help(Plotter) for accurate signature.
         """
         self.table = table
+        self.sample_size = sample_size
+        self.stratify = stratify
+        self.random_state = random_state
+
+    def _sample(self, columns=None):
+        """
+        Provide the specified columns of at most sample_size rows of the table, in their original order.
+        """
+        table = self.table if columns is None else self.table[list(columns)]
+        if self.sample_size is None or len(table) <= self.sample_size:
+            return table
+        generator = np.random.default_rng(self.random_state)
+        if self.stratify is None:
+            positions = generator.choice(len(table), self.sample_size, replace=False)
+        else:
+            codes, strata = pd.factorize(self.table[self.stratify])
+            # Missing values form a stratum of their own.
+            codes = np.where(codes < 0, len(strata), codes)
+            counts = np.bincount(codes, minlength=len(strata) + 1)
+            quotas = self._allocate(counts)
+            # Shuffle the rows, group them by stratum and keep the first quota rows of each stratum.
+            order = generator.permutation(len(table))
+            order = order[np.argsort(codes[order], kind='stable')]
+            ranks = np.arange(len(table)) - np.repeat(np.cumsum(counts) - counts, counts)
+            positions = order[ranks < np.repeat(quotas, counts)]
+        return table.iloc[np.sort(positions)]
 
-    def missing_data(self):
+    def _allocate(self, counts):
+        """
+        Share sample_size rows between strata of the specified sizes, in proportion to their sizes.
+        Every stratum keeps at least one row unless there are more strata than rows, in which case the largest strata get one each.
+        The quotas always sum to sample_size, as the rows left after rounding down go to the largest remainders.
+        """
+        quotas = (counts > 0).astype('int64')
+        if quotas.sum() > self.sample_size:
+            quotas[:] = 0
+            quotas[np.argsort(-counts, kind='stable')[:self.sample_size]] = 1
+            return quotas
+        capacity = counts - quotas
+        spare = self.sample_size - quotas.sum()
+        shares = capacity * spare / capacity.sum()
+        extra = np.floor(shares).astype('int64')
+        extra[np.argsort(extra - shares, kind='stable')[:spare - extra.sum()]] += 1
+        return quotas + extra
+
+    def missing_data(self, columns=None):
         """
         Generate a matrix of values within a specified dataframe.
+        Args:
+            columns(list): a list of column names to be shown, or every column if not specified (optional).
         Returns:
             Matplotlib AxesSubplot object: matrix object representing present and missing values.
         """
-        return msno.matrix(self.table)
+        return msno.matrix(self._sample(columns))
 
-    def pair_plot(self):
+    def pair_plot(self, columns=None, kind='scatter', gridsize=30):
         """
         Generate a pair-plot of the dataframe.
+        Args:
+            columns(list): a list of column names to be plotted, or every column if not specified (optional).
+            kind(str): 'scatter' to draw every point, 'hexbin' to draw hexagonal bin counts, or 'hist' or 'kde' for seaborn's density panels.
+            gridsize(int): the number of hexagons across each hexbin panel.
         Returns:
             Grid: grid of scatterplots based on inputted dataframe.
         """
-        return sns.pairplot(self.table)
+        data = self._sample(columns)
+        if kind != 'hexbin':
+            return sns.pairplot(data, kind=kind)
+        grid = sns.PairGrid(data, dropna=True)
+        grid.map_diag(plt.hist, bins=gridsize)
+        grid.map_offdiag(_hexbin, gridsize=gridsize)
+        return grid
+
+    def histograms(self, histograms):
+        """
+        Draw histograms from pre-binned counts, such as those of DataFrameInfo.compute_histograms.
+        Args:
+            histograms(dict): a tuple of the bin counts and bin edges keyed by column name.
+        Returns:
+            NumPy array: the Axes of the histograms, three to a row.
+        """
+        rows = max(-(-len(histograms) // 3), 1)
+        _, axes = plt.subplots(rows, 3, figsize=(15, 20), squeeze=False)
+        for axis, (column, (counts, edges)) in zip(axes.flat, histograms.items()):
+            axis.stairs(counts, edges, fill=True)
+            axis.set_title(column)
+        for axis in axes.flat[len(histograms):]:
+            axis.set_visible(False)
+        return axes
     
     def correlation(self):
         """
@@ -65,23 +157,30 @@ class Plotter:
         plt.ylabel('Percentage')
         return plt.bar(categories, percentages, tick_label=categories)
 
-    def line_graph(self, projected_loss, real_loss):
+    def line_graph(self, projected_loss, real_loss=None):
         """
         Visualise projected loss using line graph.
         Displays PyPlot of projected loss data.
         Args:
-            projected_loss(float): value for charged off loans if all their instalments were paid in full.
-            real_loss(float): projected_loss minus the payments already made before the loans were charged off.
+            projected_loss(float or pandas.DataFrame): value for charged off loans if all their instalments were paid in full,
+                or a cash flow projection from cash_flow_projection.project_cash_flows to plot month by month.
+            real_loss(float): projected_loss minus the payments already made before the loans were charged off (not used with a projection).
         Returns:
             Plot: a line graph presenting the potential revenue of charged off loans over 60 months.
         """
-        months = [0, 60]
-        loss = [0, projected_loss]
-        real_loss_plot = [0, real_loss]
-        plt.plot(months, loss, label='Projected Loss')
-        plt.plot(months, real_loss_plot, label='Real Projected Loss')
+        if isinstance(projected_loss, pd.DataFrame):
+            for segment, projection in projected_loss.groupby('segment', sort=False):
+                plt.plot(projection['month'], projection['cumulative_expected'], label=f'{segment} Expected')
+                plt.plot(projection['month'], projection['cumulative_lost'], label=f'{segment} Lost')
+            plt.ylabel('Cumulative Cash Flow')
+        else:
+            months = [0, 60]
+            loss = [0, projected_loss]
+            real_loss_plot = [0, real_loss]
+            plt.plot(months, loss, label='Projected Loss')
+            plt.plot(months, real_loss_plot, label='Real Projected Loss')
+            plt.ylabel('Projected Loss')
         plt.xlabel('Months')
-        plt.ylabel('Projected Loss')
         leg = plt.legend(loc='upper center')
         plt.show()
         
@@ -94,6 +193,31 @@ class Plotter:
             matplotlib Axes: a heatmap of the correlation scores between columns stated in column_names.
         """
         label_encoder = preprocessing.LabelEncoder()
-        for column in column_names:
-            self.table[column] = label_encoder.fit_transform(self.table[column])
-        return sns.heatmap(self.table[column_names].corr(), annot=True, cmap='coolwarm')
+        # Encode into a new table so the caller's columns are left untouched.
+        encoded_table = self.table[column_names].apply(label_encoder.fit_transform)
+        return sns.heatmap(encoded_table.corr(), annot=True, cmap='coolwarm')
+
+    def association_heat_map(self, association_matrix):
+        """
+        Visualise the associations between categorical columns, such as loan status and risk factors.
+        Args:
+            association_matrix(pandas.DataFrame): the output of DataFrameInfo.association_matrix.
+        Returns:
+            matplotlib Axes: a heatmap of the association scores.
+        """
+        return sns.heatmap(association_matrix, annot=True, cmap='coolwarm', vmin=0, vmax=1)
+
+    def skew_histograms(self, skew_diagnostics):
+        """
+        Visualise columns transformed for skew, labelled with their skew scores after transformation.
+        Args:
+            skew_diagnostics(pandas.DataFrame): the skew_diagnostics of a DataFrameTransform after boxcox_transform or yeojohnson_transform.
+        Returns:
+            matplotlib Axes: overlaid histograms of the transformed columns, or None when no column was transformed.
+        """
+        plot = None
+        for row in skew_diagnostics.itertuples():
+            plot = sns.histplot(self.table[row.output_column], label=f'Skewness: {row.skew_after:.2f}')
+        if plot is not None:
+            plot.legend()
+        return plot
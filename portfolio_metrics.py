@@ -0,0 +1,135 @@
+# The loan_status values of loans that have stopped being repaid.
+CHARGED_OFF_STATUSES = ['Charged Off']
+
+# The loan_status values of loans with overdue payments.
+LATE_STATUSES = ['Late (16-30 days)', 'Late (31-120 days)', 'Default']
+
+# The money columns summed in the aggregate table.
+SUM_COLUMNS = ['funded_amount', 'funded_amount_inv', 'out_prncp', 'out_prncp_inv', 'instalment', 'total_payment']
+
+# The money columns needed for the recovery percentages.
+RECOVERY_COLUMNS = ['funded_amount', 'funded_amount_inv', 'out_prncp', 'out_prncp_inv', 'instalment']
+
+
+def recovery_percentages(totals, months=6):
+    """
+    Calculate the percentage of total loans and investor loan funds repaid, and the percentage repaid after a number of months.
+
+    Args:
+        totals(pandas.Series or dict): the sums of the RECOVERY_COLUMNS over the loans, e.g. loan_payments[RECOVERY_COLUMNS].sum().
+        months(int): the number of months of instalments for the projected recovery.
+
+    Returns:
+        dict: the percentages recovered, keyed as in DataFrameInfo.recovered_loans.
+    """
+    overall_percentage_recovered = round((totals['funded_amount'] - totals['out_prncp']) / totals['funded_amount'] * 100, 2)
+    percentage_investments_recovered = round((totals['funded_amount_inv'] - totals['out_prncp_inv']) / totals['funded_amount_inv'] * 100, 2)
+    percentage_recovered_after_months = round(totals['instalment'] * months / totals['funded_amount'] * 100, 2)
+    return {'Loans Recovered': overall_percentage_recovered, 'Investments Recovered': percentage_investments_recovered,
+            f'Loans Recovered\n After {months} months': percentage_recovered_after_months}
+
+
+class PortfolioMetrics:
+    """
+    Initialise class for loan recovery and loss figures derived from a single grouped aggregate of the loan payments table.
+
+    The table is scanned once to sum the money columns by loan_status and term (and any extra grouping columns);
+    every figure is then derived from that small aggregate, so repeated calls cost almost nothing.
+
+    Attributes:
+        aggregate (pandas.DataFrame): the number of loans, summed money columns and total amount due over the full term, for each group.
+        late_statuses (list): the loan_status values counted as overdue.
+        late_customers (int): the number of distinct customers with overdue loans.
+    """
+    def __init__(self, loan_payments, extra_groups=None, late_statuses=LATE_STATUSES):
+        """
+        See help(PortfolioMetrics) for accurate signature.
+
+        Args:
+            loan_payments(pandas.DataFrame): the loan payments table.
+            extra_groups(list): further columns to group by, e.g. ['grade'] or ['issue_date'] (optional).
+            late_statuses(list): the loan_status values counted as overdue.
+        """
+        self.late_statuses = late_statuses
+        self.group_columns = ['loan_status', 'term'] + list(extra_groups or [])
+        table = loan_payments[self.group_columns + SUM_COLUMNS].assign(amount_due=loan_payments['instalment'] * loan_payments['term'])
+        aggregations = {'loans': ('funded_amount', 'size'), **{column: (column, 'sum') for column in SUM_COLUMNS + ['amount_due']}}
+        self.aggregate = table.groupby(self.group_columns, observed=True, dropna=False).agg(**aggregations)
+        self.late_customers = loan_payments.loc[loan_payments['loan_status'].isin(late_statuses), 'member_id'].nunique()
+
+    def _totals(self, statuses=None):
+        """
+        Sum the aggregate over every group, or over the groups with the specified loan_status values.
+        """
+        if statuses is None:
+            return self.aggregate.sum()
+        return self.aggregate[self.aggregate.index.get_level_values('loan_status').isin(statuses)].sum()
+
+    def by_segment(self, *columns):
+        """
+        Provide the aggregate summed over the specified grouping columns.
+
+        Args:
+            columns(list): grouping columns to keep, e.g. 'loan_status' or 'grade' (optional).
+
+        Returns:
+            pandas.DataFrame: the aggregate table, grouped by the specified columns or by every grouping column.
+        """
+        if not columns:
+            return self.aggregate
+        return self.aggregate.groupby(level=list(columns), observed=True, dropna=False).sum()
+
+    def recovery(self, months=6):
+        """
+        Calculate the percentage of total loans and investor loan funds repaid, and the percentage repaid after a number of months.
+
+        Args:
+            months(int): the number of months of instalments for the projected recovery.
+
+        Returns:
+            dict: the percentages recovered, keyed as in DataFrameInfo.recovered_loans.
+        """
+        return recovery_percentages(self._totals(), months)
+
+    def charged_off(self, statuses=CHARGED_OFF_STATUSES):
+        """
+        Summarise the loans that have been charged off.
+
+        Args:
+            statuses(list): the loan_status values counted as charged off.
+
+        Returns:
+            dict: the number and percentage of charged off loans and the amount paid towards them.
+        """
+        totals, charged_off = self._totals(), self._totals(statuses)
+        return {'loans': int(charged_off['loans']), 'percentage_of_loans': round(charged_off['loans'] / totals['loans'] * 100, 2),
+                'amount_paid': round(charged_off['total_payment'], 2)}
+
+    def projected_loss(self, statuses=CHARGED_OFF_STATUSES):
+        """
+        Calculate the revenue lost on loans if none of their remaining instalments are paid.
+
+        Args:
+            statuses(list): the loan_status values of the loans at risk.
+
+        Returns:
+            dict: the revenue due over the full terms of the loans, the amount already paid and the resulting loss.
+        """
+        loans = self._totals(statuses)
+        return {'projected_revenue': round(loans['amount_due'], 2), 'amount_paid': round(loans['total_payment'], 2),
+                'projected_loss': round(loans['amount_due'] - loans['total_payment'], 2)}
+
+    def late_exposure(self):
+        """
+        Calculate the exposure of the company to loans with overdue payments.
+
+        Returns:
+            dict: the percentage of loans and of the funded amount that are overdue, the number of customers affected,
+                the outstanding principal that would be lost if they were charged off and the projected loss including interest.
+        """
+        totals, late = self._totals(), self._totals(self.late_statuses)
+        return {'percentage_late': round(late['loans'] / totals['loans'] * 100, 2),
+                'late_customers': int(self.late_customers),
+                'possible_loss': round(late['out_prncp'], 2),
+                'projected_loss': round(late['amount_due'] - late['total_payment'], 2),
+                'percentage_amount_late': round(late['funded_amount'] / totals['funded_amount'] * 100, 2)}
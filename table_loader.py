@@ -0,0 +1,141 @@
+# Import necessary modules
+import os
+
+
+import pandas as pd
+
+
+def save_snapshot(table, file_name):
+    """
+    Save a table as a columnar Parquet snapshot alongside its CSV file name.
+    Unlike CSV, the snapshot preserves dtypes such as the float 'term' column and the Period date columns.
+    Args:
+        table(pandas.DataFrame): the table to be saved.
+        file_name(str): the CSV file name of the table, e.g. 'transformed_table.csv'.
+    """
+    table.to_parquet(snapshot_path(file_name), index=False)
+
+
+def snapshot_path(file_name):
+    """
+    Provide the Parquet snapshot path for a CSV file name.
+    Args:
+        file_name(str): the CSV file name of the table.
+    Returns:
+        str: the file name with a .parquet extension.
+    """
+    return os.path.splitext(file_name)[0] + '.parquet'
+
+
+class SnapshotWriter:
+    """
+    Initialise a writer that saves a table chunk by chunk to its CSV file and Parquet snapshot at the same time,
+    so a table streamed from the database is never held in memory whole.
+
+    The snapshot schema is taken from the first chunk and later chunks are cast to it, so the snapshot keeps the dtypes
+    the database returned. Columns with no values in the first chunk are stored as text. The snapshot is written to a
+    temporary file and only replaces the previous one once every chunk has been written.
+
+    Attributes:
+        file_name (str): the name of the CSV file to be written.
+        rows (int): the number of rows written so far.
+    """
+    def __init__(self, file_name):
+        """
+        See help(SnapshotWriter) for accurate signature.
+        """
+        self.file_name = file_name
+        self.rows = 0
+        self._csv_file = None
+        self._parquet_writer = None
+        self._schema = None
+
+    def __enter__(self):
+        self._csv_file = open(self.file_name, 'w', newline='')
+        return self
+
+    def write(self, chunk):
+        """
+        Append a chunk of rows to the CSV file and the Parquet snapshot.
+        """
+        # Imported here so importing the table loaders stays fast.
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        chunk.to_csv(self._csv_file, header=(self.rows == 0), index=False)
+        batch = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._parquet_writer is None:
+            self._schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in batch.schema],
+                                     metadata=batch.schema.metadata)
+            self._parquet_writer = pq.ParquetWriter(snapshot_path(self.file_name) + '.tmp', self._schema)
+        self._parquet_writer.write_table(batch.cast(self._schema))
+        self.rows += len(chunk)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._csv_file.close()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            if exc_type is None:
+                # Replaced after the CSV file is closed, so read_table sees the snapshot as current.
+                os.replace(snapshot_path(self.file_name) + '.tmp', snapshot_path(self.file_name))
+            else:
+                os.remove(snapshot_path(self.file_name) + '.tmp')
+
+
+def read_table(file_name, columns=None):
+    """
+    Load a locally saved table, preferring its Parquet snapshot over the CSV file.
+    The snapshot is only used when it is at least as recent as the CSV file, so a rewritten CSV is never shadowed by a stale snapshot.
+    Args:
+        file_name(str): the CSV file name of the table.
+        columns(list): the column names to be loaded, or every column if not specified (optional).
+    Returns:
+        pandas.DataFrame: the loaded table.
+    """
+    parquet_file = snapshot_path(file_name)
+    if os.path.exists(parquet_file) and (not os.path.exists(file_name) or os.path.getmtime(parquet_file) >= os.path.getmtime(file_name)):
+        return pd.read_parquet(parquet_file, columns=columns, memory_map=True)
+    return pd.read_csv(file_name, usecols=columns)
+
+
+def open_table(columns=None):
+    """
+    Load loan_payments table as dataframe from local directory.
+    Args:
+        columns(list): the column names to be loaded, or every column if not specified (optional).
+    Returns:
+        pandas.DataFrame: a table of loan data to be used in the EDA project.
+    """
+    return read_table('loan_payments.csv', columns)
+
+
+def open_null_removed_table(columns=None):
+    """
+    Load null-removed loan_payments table as dataframe from local directory.
+    Args:
+        columns(list): the column names to be loaded, or every column if not specified (optional).
+    Returns:
+        pandas.DataFrame: a table of loan data without null values.
+    """
+    return read_table('null_removed_table.csv', columns)
+
+
+def open_transformed_table(columns=None):
+    """
+    Load transformed loan_payments table as dataframe from local directory.
+    Args:
+        columns(list): the column names to be loaded, or every column if not specified (optional).
+    Returns:
+        pandas.DataFrame: a table of loan data transformed by imputation, data removal and skew correction.
+    """
+    return read_table('transformed_table.csv', columns)
+
+
+def open_latest_table(columns=None):
+    """
+    Load latest transformation of the loan_payments table in the local directory.
+    Args:
+        columns(list): the column names to be loaded, or every column if not specified (optional).
+    Returns:
+        pandas.DataFrame: a table of loan data transformed by imputation, data removal, skew correction and outlier imputation.
+    """
+    return read_table('refined_table.csv', columns)